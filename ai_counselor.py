@@ -4,76 +4,206 @@ Provides mental health support and guidance for students
 """
 
 import streamlit as st
+import numpy as np
+import atexit
+import concurrent.futures
 import random
-from datetime import datetime
+import re
+import html
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
 from shared_data import shared_data_manager
 
-# Try to import Google Generative AI, with fallback to local responses
+# Google Generative AI is heavy to import, so only check it is installed here and
+# import it on first use; without it the counselor falls back to local responses
 try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
+    GEMINI_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
     GEMINI_AVAILABLE = False
-    genai = None
+_genai = None
+
+def _lazy_genai():
+    """Import google.generativeai on first use"""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
+
+# Background writer for chat persistence and the semantic cache. A single worker
+# keeps the read-modify-write updates of the shared_data files strictly ordered.
+_persist_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+atexit.register(_persist_pool.shutdown, wait=True)
+
+# Counselor persona sent once as the Gemini system instruction rather than with every prompt
+COUNSELOR_PERSONA = (
+    "You are a compassionate and professional student counselor AI. "
+    "Please provide a supportive, empathetic, and helpful response to the student's concern. "
+    "Consider the student's emotional state and offer appropriate guidance. "
+    "If the student is in crisis, recommend professional help. "
+    "Keep your response concise but meaningful, around 2-3 sentences."
+)
+
+# Chat bubble markup; messages are HTML-escaped before being formatted in
+STUDENT_BUBBLE_TEMPLATE = (
+    '<div style="background: #EFF6FF; border-left: 4px solid #3B82F6; padding: 12px; border-radius: 8px; margin: 8px 0; text-align: right;">'
+    '<strong style="color: #1E40AF;">You:</strong> <span style="color: #374151;">{msg}</span>'
+    '</div>'
+)
+COUNSELOR_BUBBLE_TEMPLATE = (
+    '<div style="background: #F3E8FF; border-left: 4px solid #8B5CF6; padding: 12px; border-radius: 8px; margin: 8px 0;">'
+    '<strong style="color: #7C3AED;">🤖 Counselor:</strong> <span style="color: #374151;">{msg}</span>'
+    '</div>'
+)
+
+# Suffixes appended to local fallback replies
+STRATEGY_PREFIX = "\n\n💡 **Helpful Strategy**: "
+HELP_SUFFIX = "\n\n🏥 **Important**: Please consider reaching out to a professional counselor or trusted adult for additional support."
+
+# sentence-transformers (for the semantic response cache) pulls in torch, so it is
+# likewise only imported when the embedding model is first loaded
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+# Try to import pyahocorasick for single-pass keyword classification
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    ahocorasick = None
+
+@st.cache_resource
+def load_embedding_model():
+    """Load the sentence embedding model once per process"""
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer("all-MiniLM-L6-v2")
+    except Exception as e:
+        st.warning(f"Embedding model initialization failed: {str(e)}")
+        return None
+
+@st.cache_resource
+def build_gemini_model(api_key: str, model_name: str):
+    """Configure Gemini and build the counselor model once per process"""
+    genai = _lazy_genai()
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        model_name,
+        system_instruction=COUNSELOR_PERSONA,
+        generation_config=genai.types.GenerationConfig(
+            max_output_tokens=120,
+            temperature=0.7,
+            candidate_count=1
+        )
+    )
 
 class AIChatCounselor:
+    # Maximum number of Gemini replies kept in the in-memory response cache
+    RESPONSE_CACHE_SIZE = 1024
+    # Minimum cosine similarity for reusing a reply to a paraphrased prompt
+    SEMANTIC_CACHE_THRESHOLD = 0.92
+    # Maximum number of prompts kept in the semantic cache
+    SEMANTIC_CACHE_SIZE = 500
+    # Number of recent chat turns kept in session state; older turns live only on disk
+    CHAT_HISTORY_WINDOW = 50
+    # Dimension of all-MiniLM-L6-v2 sentence embeddings
+    EMBEDDING_DIM = 384
+    
+    # Keyword sets per message category, built once at import
+    _CRISIS_WORDS = frozenset({'suicide', 'kill myself', 'end it all', 'want to die', 'hurt myself'})
+    _DEPRESSION_WORDS = frozenset({'depressed', 'hopeless', 'worthless', 'empty', 'sad all the time'})
+    _ANXIETY_WORDS = frozenset({'anxious', 'panic', 'worry', 'nervous', 'scared', 'fear'})
+    _STRESS_WORDS = frozenset({'stressed', 'overwhelmed', 'pressure', 'too much', 'can\'t cope'})
+    _ACADEMIC_WORDS = frozenset({'exam', 'study', 'grades', 'homework', 'assignment', 'academic'})
+    _POSITIVE_WORDS = frozenset({'good', 'great', 'happy', 'fine', 'okay', 'better', 'well'})
+    
+    # Categories in priority order; earlier categories win when several match
+    _CATEGORY_KEYWORDS = (
+        ("crisis", _CRISIS_WORDS),
+        ("depression", _DEPRESSION_WORDS),
+        ("anxiety", _ANXIETY_WORDS),
+        ("stress", _STRESS_WORDS),
+        ("academic", _ACADEMIC_WORDS),
+        ("positive", _POSITIVE_WORDS),
+    )
+    _CATEGORY_PRIORITY = {category: rank for rank, (category, _) in enumerate(_CATEGORY_KEYWORDS)}
+    
+    # Single-pass keyword classifier. The alternation sits inside a lookahead so
+    # overlapping keywords are all reported to analyze_message.
+    _CATEGORY_REGEX = re.compile(
+        "(?=" + "|".join(
+            f"(?P<{category}>" + "|".join(re.escape(word) for word in sorted(words)) + ")"
+            for category, words in _CATEGORY_KEYWORDS
+        ) + ")",
+        re.IGNORECASE
+    )
+
     def __init__(self):
-        # Initialize Gemini if available
-        self.gemini_model = None
-        if GEMINI_AVAILABLE:
-            try:
-                # Get API key from environment variable
-                import os
-                api_key = os.getenv("GOOGLE_API_KEY")
-                if api_key:
-                    genai.configure(api_key=api_key)
-                    # Initialize the model
-                    self.gemini_model = genai.GenerativeModel('gemini-pro')
-                else:
-                    st.warning("Google API key not found. Set GOOGLE_API_KEY environment variable for Gemini integration.")
-            except Exception as e:
-                st.warning(f"Gemini initialization failed: {str(e)}")
-                self.gemini_model = None
+        # Gemini is initialized on first use, see the gemini_model property
+        self._gemini_model = None
+        self._gemini_initialized = False
+        
+        # Exact-match cache of Gemini replies, keyed on the normalized prompt. Loaded from disk
+        # once here; afterwards the file is only written behind, on the persist worker.
+        self._response_lock = threading.Lock()
+        self._response_cache = OrderedDict(shared_data_manager.load_response_cache())
+        while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+        
+        # Semantic cache: normalized prompt embeddings with parallel reply/student ID lists.
+        # The counselor is shared by every session thread, so the three are only touched under the lock.
+        self._semantic_lock = threading.Lock()
+        self._cache_embs, self._cache_responses, self._cache_owners = shared_data_manager.load_semantic_cache()
+        if self._cache_embs is None:
+            self._cache_embs = np.empty((0, self.EMBEDDING_DIM), dtype=np.float32)
         
+        # Response templates per category, stored as tuples for fast random indexing
         self.counselor_responses = {
-            "greeting": [
+            "greeting": (
                 "Hello! I'm here to listen and support you. How are you feeling today?",
                 "Hi there! I'm your AI counselor. What's on your mind?",
                 "Welcome! I'm here to help you work through any concerns. How can I assist you today?"
-            ],
-            "stress": [
+            ),
+            "stress": (
                 "I understand you're feeling stressed. Let's talk about what's causing this stress. Can you tell me more?",
                 "Stress is very common, and you're not alone. What specific situations are making you feel this way?",
                 "It's okay to feel stressed sometimes. Let's work together to find some coping strategies."
-            ],
-            "anxiety": [
+            ),
+            "anxiety": (
                 "Anxiety can feel overwhelming, but there are ways to manage it. Can you describe what triggers your anxiety?",
                 "I hear that you're experiencing anxiety. Remember, this feeling is temporary and manageable.",
                 "Let's explore some breathing techniques and grounding exercises that might help with your anxiety."
-            ],
-            "depression": [
+            ),
+            "depression": (
                 "Thank you for sharing this with me. Depression is serious, and I want you to know that help is available.",
                 "You're brave for reaching out. While I can offer support, please consider speaking with a professional counselor.",
                 "I'm here to listen. Remember that you matter, and there are people who care about you."
-            ],
-            "academic": [
+            ),
+            "academic": (
                 "Academic challenges are common. Let's talk about specific areas where you're struggling.",
                 "It sounds like you're dealing with academic pressure. What subjects or tasks are most challenging?",
                 "Academic stress is manageable with the right strategies. Let's work on a plan together."
-            ],
-            "positive": [
+            ),
+            "positive": (
                 "I'm glad to hear you're doing well! What's been going particularly good for you?",
                 "That's wonderful! It's great that you're feeling positive. How can we maintain this momentum?",
                 "I'm happy you're in a good place. What strategies have been helping you?"
-            ],
-            "crisis": [
+            ),
+            "crisis": (
                 "I'm very concerned about what you've shared. Please reach out to a professional immediately.",
                 "This sounds like a serious situation. Please contact emergency services or a crisis hotline.",
                 "Your safety is the priority. Please speak with a trusted adult or counselor right away."
-            ]
+            )
         }
         
-        self.coping_strategies = [
+        self.coping_strategies = (
             "🧘 Try deep breathing: Inhale for 4 counts, hold for 4, exhale for 4",
             "🚶 Take a short walk outside for fresh air and movement",
             "📝 Write down your thoughts and feelings in a journal",
@@ -84,128 +214,258 @@ class AIChatCounselor:
             "😴 Ensure you're getting enough sleep (7-9 hours)",
             "🍎 Maintain a healthy diet and stay hydrated",
             "🎨 Engage in a creative activity you enjoy"
-        ]
+        )
+        
+        # Categories whose fallback replies get a coping strategy or a referral note
+        self._needs_strategy = frozenset({"stress", "anxiety"})
+        self._needs_help = frozenset({"depression", "crisis"})
+        self._rng = random.Random()
+        
+        # Which templates contain the "Student" placeholder, so personalization can skip the rest
+        self._has_student_token = {
+            category: tuple("Student" in template for template in templates)
+            for category, templates in self.counselor_responses.items()
+        }
+    
+    @property
+    def gemini_model(self):
+        """Gemini model, built on first use so google.generativeai is only imported when needed"""
+        if not self._gemini_initialized:
+            self._gemini_initialized = True
+            self._gemini_model = self._init_gemini()
+        return self._gemini_model
+    
+    def _init_gemini(self):
+        """Initialize Gemini if available"""
+        if not GEMINI_AVAILABLE:
+            return None
+        try:
+            # Get API key from environment variable
+            api_key = os.getenv("GOOGLE_API_KEY")
+            if api_key:
+                # Flash suits the short replies; GEMINI_MODEL can escalate to e.g. gemini-1.5-pro
+                model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+                return build_gemini_model(api_key, model_name)
+            st.warning("Google API key not found. Set GOOGLE_API_KEY environment variable for Gemini integration.")
+        except Exception as e:
+            st.warning(f"Gemini initialization failed: {str(e)}")
+        return None
     
     def analyze_message(self, message: str) -> str:
         """Analyze student message and determine appropriate response category"""
-        message_lower = message.lower()
+        return _classify(message.lower())
+    
+    @staticmethod
+    def _response_cache_key(message: str, owner: str) -> str:
+        """Build a stable cache key from the student key and the lowercased, whitespace-normalized prompt"""
+        normalized_message = " ".join(message.lower().split())
+        return hashlib.sha256(f"{owner}\x00{normalized_message}".encode("utf-8")).hexdigest()
+    
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        """Look up a cached Gemini reply in the in-memory LRU cache"""
+        # Shared by every session thread, so lookups and evictions go through the lock
+        with self._response_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+            return cached
+    
+    def _remember_response(self, key: str, response: str):
+        """Store a Gemini reply in the in-memory LRU cache"""
+        with self._response_lock:
+            self._response_cache[key] = response
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+    
+    def _embed_message(self, message: str) -> Optional[np.ndarray]:
+        """Embed a message as a normalized float32 vector, if an embedder is available"""
+        embedder = load_embedding_model()
+        if embedder is None:
+            return None
+        try:
+            return embedder.encode(message, normalize_embeddings=True).astype(np.float32)
+        except Exception:
+            return None
+    
+    def _get_semantic_response(self, query_emb: np.ndarray, owner: str) -> Optional[str]:
+        """Return the cached reply for the most similar earlier prompt from the same student"""
+        with self._semantic_lock:
+            if len(self._cache_responses) == 0:
+                return None
+            
+            sims = self._cache_embs @ query_emb
+            same_student = np.fromiter((cached_owner == owner for cached_owner in self._cache_owners),
+                                       dtype=bool, count=len(self._cache_owners))
+            sims = np.where(same_student, sims, -1.0)
+            best = int(np.argmax(sims))
+            if sims[best] > self.SEMANTIC_CACHE_THRESHOLD:
+                return self._cache_responses[best]
+            return None
+    
+    def _remember_semantic_response(self, query_emb: np.ndarray, owner: str, response: str):
+        """Append a prompt embedding and its reply to the semantic cache and persist it in the background"""
+        with self._semantic_lock:
+            self._cache_embs = np.vstack([self._cache_embs, query_emb[np.newaxis, :]])[-self.SEMANTIC_CACHE_SIZE:]
+            self._cache_responses = (self._cache_responses + [response])[-self.SEMANTIC_CACHE_SIZE:]
+            self._cache_owners = (self._cache_owners + [owner])[-self.SEMANTIC_CACHE_SIZE:]
+            # Fresh objects on every append, so the writer gets a consistent snapshot
+            snapshot = (self._cache_embs, self._cache_responses, self._cache_owners)
+        _persist_pool.submit(shared_data_manager.save_semantic_cache, *snapshot)
+    
+    @staticmethod
+    def _cache_owner(student_name: str, student_id: Optional[str]) -> str:
+        """Key cached replies by student ID; names are only a fallback since two students can share one"""
+        return student_name if student_id is None else f"id:{student_id}"
+    
+    def _build_prompt(self, message: str, student_name: str) -> str:
+        """Create the per-turn part of the Gemini prompt; the persona is the model's system instruction"""
+        return f'A student named {student_name} has shared the following concern:\n\n"{message}"'
+    
+    def _lookup_cached_reply(self, message: str, student_name: str,
+                             student_id: Optional[str]) -> Tuple[Optional[str], tuple]:
+        """Check the exact-match and semantic caches; also return the state needed to store a new reply"""
+        owner = self._cache_owner(student_name, student_id)
+        cache_key = self._response_cache_key(message, owner)
+        cached = self._get_cached_response(cache_key)
+        if cached:
+            return cached, (cache_key, owner, None)
         
-        # Crisis indicators
-        crisis_words = ['suicide', 'kill myself', 'end it all', 'want to die', 'hurt myself']
-        if any(word in message_lower for word in crisis_words):
-            return "crisis"
+        query_emb = self._embed_message(message)
+        if query_emb is not None:
+            cached = self._get_semantic_response(query_emb, owner)
+            if cached:
+                self._remember_response(cache_key, cached)
+                return cached, (cache_key, owner, query_emb)
         
-        # Depression indicators
-        depression_words = ['depressed', 'hopeless', 'worthless', 'empty', 'sad all the time']
-        if any(word in message_lower for word in depression_words):
-            return "depression"
+        return None, (cache_key, owner, query_emb)
+    
+    def _store_reply(self, cache_state: tuple, reply: str):
+        """Record a fresh Gemini reply in the response caches"""
+        cache_key, owner, query_emb = cache_state
+        self._remember_response(cache_key, reply)
+        _persist_pool.submit(shared_data_manager.save_cached_response, cache_key, reply)
+        if query_emb is not None:
+            self._remember_semantic_response(query_emb, owner, reply)
+    
+    def _local_response(self, category: str, student_name: str) -> str:
+        """Generate a response from the local templates"""
+        templates = self.counselor_responses[category]
+        idx = self._rng.randrange(len(templates))
+        base_response = templates[idx]
         
-        # Anxiety indicators
-        anxiety_words = ['anxious', 'panic', 'worry', 'nervous', 'scared', 'fear']
-        if any(word in message_lower for word in anxiety_words):
-            return "anxiety"
+        # Add personalized touch, only for templates that mention the student
+        if student_name != "Student" and self._has_student_token[category][idx]:
+            base_response = base_response.replace("Student", student_name)
         
-        # Stress indicators
-        stress_words = ['stressed', 'overwhelmed', 'pressure', 'too much', 'can\'t cope']
-        if any(word in message_lower for word in stress_words):
-            return "stress"
+        parts = [base_response]
         
-        # Academic indicators
-        academic_words = ['exam', 'study', 'grades', 'homework', 'assignment', 'academic']
-        if any(word in message_lower for word in academic_words):
-            return "academic"
+        # Add coping strategy for stress/anxiety
+        if category in self._needs_strategy:
+            parts.append(STRATEGY_PREFIX)
+            parts.append(self.coping_strategies[self._rng.randrange(len(self.coping_strategies))])
         
-        # Positive indicators
-        positive_words = ['good', 'great', 'happy', 'fine', 'okay', 'better', 'well']
-        if any(word in message_lower for word in positive_words):
-            return "positive"
+        # Add professional help recommendation for serious issues
+        if category in self._needs_help:
+            parts.append(HELP_SUFFIX)
         
-        # Default to greeting for general messages
-        return "greeting"
+        return "".join(parts)
     
-    def generate_response(self, message: str, student_name: str = "Student") -> str:
+    def generate_response(self, message: str, student_name: str = "Student",
+                          student_id: Optional[str] = None) -> str:
         """Generate appropriate counselor response"""
+        category = self.analyze_message(message)
+        
+        # Crisis messages always get the curated safety reply immediately,
+        # bypassing the caches and the Gemini round-trip
+        if category == "crisis":
+            return self._local_response(category, student_name)
+        
         # Use Gemini if available and configured
         if self.gemini_model is not None:
+            cached, cache_state = self._lookup_cached_reply(message, student_name, student_id)
+            if cached:
+                return cached
+            
             try:
-                # Create a prompt for Gemini with context
-                prompt = f"""
-                You are a compassionate and professional student counselor AI. 
-                A student named {student_name} has shared the following concern:
-                
-                "{message}"
-                
-                Please provide a supportive, empathetic, and helpful response. 
-                Consider the student's emotional state and offer appropriate guidance.
-                If the student is in crisis, recommend professional help.
-                Keep your response concise but meaningful, around 2-3 sentences.
-                """
-                
                 # Generate response using Gemini
-                response = self.gemini_model.generate_content(prompt)
+                response = self.gemini_model.generate_content(self._build_prompt(message, student_name))
                 if response and response.text:
-                    return response.text.strip()
+                    reply = response.text.strip()
+                    self._store_reply(cache_state, reply)
+                    return reply
             except Exception as e:
                 # Fallback to local responses if Gemini fails
                 st.warning(f"Gemini response failed: {str(e)}")
         
         # Fallback to original local response generation
+        return self._local_response(category, student_name)
+    
+    def stream_response(self, message: str, student_name: str = "Student",
+                        student_id: Optional[str] = None) -> Iterator[str]:
+        """Yield the counselor response in chunks as Gemini produces them"""
         category = self.analyze_message(message)
-        base_response = random.choice(self.counselor_responses[category])
         
-        # Add personalized touch
-        if student_name != "Student":
-            base_response = base_response.replace("Student", student_name)
+        if category == "crisis":
+            yield self._local_response(category, student_name)
+            return
         
-        # Add coping strategy for stress/anxiety
-        if category in ["stress", "anxiety"]:
-            strategy = random.choice(self.coping_strategies)
-            base_response += f"\n\n💡 **Helpful Strategy**: {strategy}"
-        
-        # Add professional help recommendation for serious issues
-        if category in ["depression", "crisis"]:
-            base_response += "\n\n🏥 **Important**: Please consider reaching out to a professional counselor or trusted adult for additional support."
+        if self.gemini_model is not None:
+            cached, cache_state = self._lookup_cached_reply(message, student_name, student_id)
+            if cached:
+                yield cached
+                return
+            
+            parts = []
+            completed = False
+            try:
+                stream = self.gemini_model.generate_content(self._build_prompt(message, student_name), stream=True)
+                for chunk in stream:
+                    if chunk.text:
+                        parts.append(chunk.text)
+                        yield chunk.text
+                completed = True
+            except Exception as e:
+                st.warning(f"Gemini response failed: {str(e)}")
+            
+            # Only a stream that ran to the end is cached; a cut-off reply is followed by the local one
+            if completed and parts:
+                self._store_reply(cache_state, "".join(parts).strip())
+                return
+            if parts:
+                yield "\n\n"
         
-        return base_response
+        yield self._local_response(category, student_name)
     
-    def render_chat_interface(self, student_id: str, student_name: str):
-        """Render the chat interface in Streamlit with professional colors"""
-        st.markdown("""
-        <div style="background: linear-gradient(45deg, #8B5CF6, #7C3AED); color: white; padding: 1.5rem; border-radius: 10px; margin: 1rem 0; text-align: center; box-shadow: 0 8px 25px rgba(139, 92, 246, 0.3);">
-            <h3 style="margin: 0;">🤖 AI Chat Counselor</h3>
-            <p style="margin: 0.5rem 0 0 0;">I'm here to listen and provide support 24/7</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Initialize chat history in session state
+    @st.fragment
+    def _render_conversation(self, student_id: str, student_name: str):
+        """Render the chat history and message form as a fragment so sending only reruns this part"""
+        # Initialize chat history in session state, fetching from disk only once per session
         if f"chat_history_{student_id}" not in st.session_state:
             st.session_state[f"chat_history_{student_id}"] = []
+        if not st.session_state.get(f"history_loaded_{student_id}"):
+            st.session_state[f"history_loaded_{student_id}"] = True
             # Load previous chat history
             previous_chats = shared_data_manager.get_chat_history(student_id)
-            for chat in previous_chats[-10:]:  # Show last 10 conversations
+            for chat in previous_chats[-self.CHAT_HISTORY_WINDOW:]:
                 st.session_state[f"chat_history_{student_id}"].append({
                     "student": chat["student_message"],
-                    "counselor": chat["counselor_response"],
-                    "timestamp": chat["timestamp"]
+                    "counselor": chat["counselor_response"]
                 })
         
         # Display chat history with professional styling
         chat_container = st.container()
         with chat_container:
+            # Build all bubbles first and send them in a single markdown element
+            html_parts = []
             for chat in st.session_state[f"chat_history_{student_id}"]:
                 # Student message with sky blue background
-                st.markdown(f"""
-                <div style="background: #EFF6FF; border-left: 4px solid #3B82F6; padding: 12px; border-radius: 8px; margin: 8px 0; text-align: right;">
-                    <strong style="color: #1E40AF;">You:</strong> <span style="color: #374151;">{chat['student']}</span>
-                </div>
-                """, unsafe_allow_html=True)
-                
+                html_parts.append(STUDENT_BUBBLE_TEMPLATE.format(msg=html.escape(chat['student'])))
                 # Counselor response with purple accent
-                st.markdown(f"""
-                <div style="background: #F3E8FF; border-left: 4px solid #8B5CF6; padding: 12px; border-radius: 8px; margin: 8px 0;">
-                    <strong style="color: #7C3AED;">🤖 Counselor:</strong> <span style="color: #374151;">{chat['counselor']}</span>
-                </div>
-                """, unsafe_allow_html=True)
+                html_parts.append(COUNSELOR_BUBBLE_TEMPLATE.format(msg=html.escape(chat['counselor'])))
+            
+            if html_parts:
+                st.markdown("".join(html_parts), unsafe_allow_html=True)
         
         # Chat input
         with st.form(key=f"chat_form_{student_id}", clear_on_submit=True):
@@ -218,22 +478,36 @@ class AIChatCounselor:
                 send_button = st.form_submit_button("Send 📤", use_container_width=True)
             
             if send_button and user_message.strip():
-                # Generate AI response
-                counselor_response = self.generate_response(user_message, student_name)
+                # Show the new turn below the history and stream the AI response into it
+                with chat_container:
+                    st.markdown(STUDENT_BUBBLE_TEMPLATE.format(msg=html.escape(user_message)),
+                                unsafe_allow_html=True)
+                    st.markdown("**🤖 Counselor:**")
+                    counselor_response = st.write_stream(self.stream_response(user_message, student_name, student_id))
                 
-                # Add to session state
+                # Add to session state, keeping only the most recent turns in memory
                 new_chat = {
                     "student": user_message,
-                    "counselor": counselor_response,
-                    "timestamp": datetime.now().isoformat()
+                    "counselor": counselor_response
                 }
-                st.session_state[f"chat_history_{student_id}"].append(new_chat)
-                
-                # Save to persistent storage
-                shared_data_manager.save_chat_message(student_id, user_message, counselor_response)
+                history = st.session_state[f"chat_history_{student_id}"]
+                history.append(new_chat)
+                st.session_state[f"chat_history_{student_id}"] = history[-self.CHAT_HISTORY_WINDOW:]
                 
-                # Rerun to show new message
-                st.rerun()
+                # Save to persistent storage in the background so the UI is not held up by disk I/O
+                _persist_pool.submit(shared_data_manager.save_chat_message, student_id, user_message, counselor_response)
+    
+    def render_chat_interface(self, student_id: str, student_name: str):
+        """Render the chat interface in Streamlit with professional colors"""
+        st.markdown("""
+        <div style="background: linear-gradient(45deg, #8B5CF6, #7C3AED); color: white; padding: 1.5rem; border-radius: 10px; margin: 1rem 0; text-align: center; box-shadow: 0 8px 25px rgba(139, 92, 246, 0.3);">
+            <h3 style="margin: 0;">🤖 AI Chat Counselor</h3>
+            <p style="margin: 0.5rem 0 0 0;">I'm here to listen and provide support 24/7</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Conversation history and input rerun on their own when a message is sent
+        self._render_conversation(student_id, student_name)
         
         # Satisfaction feedback buttons
         st.markdown("---")
@@ -280,5 +554,47 @@ class AIChatCounselor:
             **Remember**: You're not alone, and seeking help is a sign of strength! 💪
             """)
 
-# Global instance
-ai_counselor = AIChatCounselor()
\ No newline at end of file
+def _build_keyword_automaton():
+    """Build an Aho-Corasick automaton over every category keyword, valued (priority, category)"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for category, words in AIChatCounselor._CATEGORY_KEYWORDS:
+        for word in words:
+            automaton.add_word(word, (AIChatCounselor._CATEGORY_PRIORITY[category], category))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+@lru_cache(maxsize=4096)
+def _classify(message_lower: str) -> str:
+    """Classify a lowercased message into a counselor response category"""
+    if _KEYWORD_AUTOMATON is not None:
+        # One linear scan finds every keyword; the highest-priority category wins
+        best = min((value for _, value in _KEYWORD_AUTOMATON.iter(message_lower)),
+                   default=None)
+        if best:
+            return best[1]
+    else:
+        best_category = None
+        best_rank = len(AIChatCounselor._CATEGORY_PRIORITY)
+        
+        # The highest-priority category wins regardless of where it appears
+        for match in AIChatCounselor._CATEGORY_REGEX.finditer(message_lower):
+            rank = AIChatCounselor._CATEGORY_PRIORITY[match.lastgroup]
+            if rank < best_rank:
+                best_category, best_rank = match.lastgroup, rank
+                if rank == 0:
+                    break
+        
+        if best_category:
+            return best_category
+    
+    # Default to greeting for general messages
+    return "greeting"
+
+@st.cache_resource
+def get_counselor() -> AIChatCounselor:
+    """Get the shared AI counselor, built once and reused across reruns"""
+    return AIChatCounselor()
\ No newline at end of file
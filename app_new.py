@@ -1,15 +1,48 @@
 # Enhanced Multi-Role DROPSAFE Dashboard
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.ensemble import RandomForestClassifier
-import joblib
 import numpy as np
 from datetime import datetime
 import json
+import copy
 import os
+import secrets
 import hashlib
+import hmac
+import sqlite3
+import string
+import tempfile
+import importlib.util
+import io
+import threading
+import time
+from collections import deque
+from jinja2 import BaseLoader, Environment
+
+# Merged uploads are kept here as parquet, keyed by file contents
+MERGED_CACHE_DIR = '.cache'
+# Merged files hold student data, so they expire with the in-memory entry and are capped in number
+MERGED_CACHE_TTL = 3600  # seconds
+MERGED_CACHE_MAX_FILES = 8
+
+# onnxruntime serves dropout_model.onnx (exported by train_model.py) when present
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec('onnxruntime') is not None
+
+# python-calamine parses xlsx in Rust; pandas falls back to openpyxl without it
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else None
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    ARGON2_AVAILABLE = True
+except ImportError:
+    ARGON2_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -20,25 +53,32 @@ st.set_page_config(
 )
 
 # Initialize session state
-if 'selected_role' not in st.session_state:
-    st.session_state.selected_role = None
-if 'student_data' not in st.session_state:
-    st.session_state.student_data = None
-if 'current_page' not in st.session_state:
-    st.session_state.current_page = 'home'
-if 'logged_in' not in st.session_state:
-    st.session_state.logged_in = False
-if 'user_credentials' not in st.session_state:
-    st.session_state.user_credentials = {}
-if 'is_first_time_user' not in st.session_state:
-    st.session_state.is_first_time_user = True
-if 'student_alerts' not in st.session_state:
-    st.session_state.student_alerts = {}
-if 'alert_notifications' not in st.session_state:
-    st.session_state.alert_notifications = []
+SESSION_DEFAULTS = {
+    'selected_role': None,
+    'student_data': None,
+    'current_page': 'home',
+    'logged_in': False,
+    'user_credentials': {},
+    'is_first_time_user': True,
+    'current_username': None,
+    'current_user_data': None,
+    'pending_read_alerts': set(),
+    'alerts_editor_version': 0,
+}
+
+def init_state():
+    """Fill in any missing session state keys with their defaults"""
+    for key, value in SESSION_DEFAULTS.items():
+        # Copy so sessions never share the same mutable default
+        st.session_state.setdefault(key, copy.copy(value))
+
+init_state()
 
 # --- ENHANCED CSS ---
-st.markdown("""
+@st.cache_data(show_spinner=False)
+def get_css() -> str:
+    """Return the app-wide stylesheet, built once per process."""
+    return """
 <style>
     /* Hero/Welcome Section */
     .hero-welcome-section {
@@ -181,24 +221,6 @@ st.markdown("""
         0%, 100% { transform: translateY(0px); }
         50% { transform: translateY(-10px); }
     }
-    
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        .hero-headline {
-            font-size: 2.5rem;
-        }
-        .hero-subheading {
-            font-size: 1.2rem;
-        }
-        .hero-actions {
-            flex-direction: column;
-            align-items: center;
-        }
-        .cta-primary, .cta-secondary {
-            width: 100%;
-            max-width: 280px;
-        }
-    }
     .hero-section {
         background: linear-gradient(135deg, #0F172A 0%, #1E293B 50%, #0D9488 100%);
         padding: 3rem 2rem;
@@ -222,7 +244,7 @@ st.markdown("""
         left: 0;
         right: 0;
         bottom: 0;
-        background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 400 300"><defs><filter id="glow"><feGaussianBlur stdDeviation="3" result="coloredBlur"/><feMerge><feMergeNode in="coloredBlur"/><feMergeNode in="SourceGraphic"/></feMerge></filter></defs><g filter="url(%23glow)" opacity="0.3"><circle cx="80" cy="60" r="3" fill="%230D9488"/><circle cx="150" cy="90" r="2" fill="%2306B6D4"/><circle cx="220" cy="70" r="3" fill="%230D9488"/><circle cx="320" cy="120" r="2" fill="%2306B6D4"/><circle cx="120" cy="150" r="2" fill="%230D9488"/><circle cx="280" cy="180" r="3" fill="%2306B6D4"/><line x1="80" y1="60" x2="150" y2="90" stroke="%230D9488" stroke-width="1" opacity="0.5"/><line x1="150" y1="90" x2="220" y2="70" stroke="%2306B6D4" stroke-width="1" opacity="0.4"/><line x1="220" y1="70" x2="320" y2="120" stroke="%230D9488" stroke-width="1" opacity="0.3"/><line x1="150" y1="90" x2="120" y2="150" stroke="%2306B6D4" stroke-width="1" opacity="0.4"/><line x1="320" y1="120" x2="280" y2="180" stroke="%230D9488" stroke-width="1" opacity="0.5"/></g></svg>') no-repeat right center;
+        background: url('app/static/hero-bg.svg') no-repeat right center;
         background-size: 400px 300px;
         opacity: 0.6;
         z-index: 1;
@@ -379,6 +401,23 @@ st.markdown("""
     .alert-success { background: linear-gradient(135deg, #d4edda, #c3e6cb); color: #155724; padding: 1.2rem; border-radius: 10px; border-left: 5px solid #28a745; margin: 1rem 0; }
     .alert-warning { background: linear-gradient(135deg, #fff3cd, #ffeaa7); color: #856404; padding: 1.2rem; border-radius: 10px; border-left: 5px solid #ffc107; margin: 1rem 0; }
     .alert-danger { background: linear-gradient(135deg, #f8d7da, #f5c6cb); color: #721c24; padding: 1.2rem; border-radius: 10px; border-left: 5px solid #dc3545; margin: 1rem 0; }
+    .alert-card { background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%); border-left: 4px solid #66bb6a; padding: 1.5rem; border-radius: 12px; margin: 1rem 0; box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1); }
+    .alert-card--high { background: linear-gradient(135deg, #fff5f5 0%, #ffeaa7 100%); border-left-color: #ff6b6b; }
+    .alert-card--normal { border-left-color: #ffa726; }
+    .alert-card.is-read { background: linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%); border-left-color: #e9ecef; opacity: 0.7; }
+    .alert-card-head { display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 0.5rem; }
+    .alert-card h4 { margin: 0; color: #0F172A; }
+    .alert-card-time { font-size: 0.9rem; color: #6c757d; }
+    .alert-card-message { margin: 0.5rem 0; color: #495057; line-height: 1.5; }
+    .alert-card-sender { margin: 0; font-size: 0.9rem; color: #6c757d; }
+    .alert-badge { color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem; }
+    .alert-badge--read { background: #28a745; }
+    .alert-badge--new { background: #dc3545; }
+    .cred-card { background: linear-gradient(135deg, #d4edda, #c3e6cb); color: #155724; padding: 2rem; border-radius: 15px; margin: 1rem 0; border-left: 5px solid #28a745; }
+    .cred-card h3, .cred-card h4 { margin-top: 0; color: #155724; }
+    .cred-card p { font-size: 1.1em; margin: 0.5rem 0; }
+    .cred-card code { background: rgba(0,0,0,0.1); padding: 0.2rem 0.5rem; border-radius: 4px; }
+    .cred-card .cred-note { font-size: 1em; margin: 1rem 0 0 0; font-weight: 600; }
     .feature-card {
         background: linear-gradient(135deg, #0F172A 0%, #1E293B 60%, #0D9488 100%);
         color: white;
@@ -400,10 +439,6 @@ st.markdown("""
             0 16px 48px rgba(13, 148, 136, 0.4),
             inset 0 1px 0 rgba(255, 255, 255, 0.2);
     }
-    @keyframes float {
-        0%, 100% { transform: translateY(0px); }
-        50% { transform: translateY(-10px); }
-    }
     @keyframes pulse {
         0% { transform: scale(1); }
         50% { transform: scale(1.02); }
@@ -505,13 +540,64 @@ st.markdown("""
         box-shadow: 0 0 0 2px rgba(13, 148, 136, 0.3);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.html(get_css())
 
 # --- HERO SECTION & NAVIGATION ---
+# Landing-page feature cards, in grid (row-major) order
+FEATURE_CARDS = (
+    ("🎯", "Smart Risk Assessment", "AI-powered analysis of attendance, grades, and fee status to identify at-risk students early."),
+    ("👥", "Multi-Role Dashboards", "Customized interfaces for students, teachers, and counselors with role-specific analytics."),
+    ("📈", "Real-time Analytics", "Live monitoring and visualization of student performance metrics and trends."),
+    ("🔔", "Early Intervention", "Automated alerts and personalized recommendations for timely support."),
+)
+
+# Compiled once at import; Jinja2 ships with Streamlit (via Altair)
+FEATURE_GRID_TEMPLATE = Environment(loader=BaseLoader(), autoescape=True).from_string(
+    '<div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem;">'
+    '{% for icon, title, text in cards %}'
+    '<div style="background: white; padding: 2rem 1.5rem; border-radius: 16px; text-align: center; '
+    'border: 1px solid rgba(13, 148, 136, 0.1); box-shadow: 0 4px 16px rgba(15, 23, 42, 0.05);">'
+    '<div style="font-size: 3rem; margin-bottom: 1rem;">{{ icon }}</div>'
+    '<h3 style="font-size: 1.3rem; font-weight: 700; color: #0F172A; margin: 1rem 0 0.5rem 0;">{{ title }}</h3>'
+    '<p style="font-size: 1rem; line-height: 1.6; color: #64748B; margin: 0;">{{ text }}</p>'
+    '</div>'
+    '{% endfor %}'
+    '</div>'
+)
+
+# The cards never change, so render them once per process
+FEATURE_GRID_HTML = FEATURE_GRID_TEMPLATE.render(cards=FEATURE_CARDS)
+
+@st.fragment
+def show_hero_login_button():
+    """Get Started button; clicks rerun only this fragment until navigation"""
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        login_clicked = st.button(
+            "🚀 Get Started - Login Here", 
+            key="hero_login_btn", 
+            help="Click to access login page", 
+            type="primary",
+            use_container_width=True
+        )
+        
+        if login_clicked:
+            # Always go to login page first
+            st.session_state.current_page = 'login'
+            st.rerun(scope="app")
+
 def show_hero_section():
+    """Display the header, plus the landing body when on the home page"""
+    render_header()
+    if st.session_state.current_page == 'home':
+        render_landing_body()
+
+def render_header():
     """Display header with logo and navigation buttons in single line"""
-    # Create header with flexbox layout similar to React component
-    st.markdown("""
+    # Header and hero/welcome section go out as one element
+    st.html("""
     <div style="
         display: flex;
         align-items: center;
@@ -539,12 +625,8 @@ def show_hero_section():
                 ">DROPSAFE</h1>
             </div>
         </div>
-
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Hero/Welcome Section
-    st.markdown("""
+
     <div class="hero-welcome-section">
         <div class="hero-content">
             <h1 class="hero-headline">Welcome to DROPSAFE</h1>
@@ -570,30 +652,16 @@ def show_hero_section():
             </div>
         </div>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Get Started Login Button - simplified for reliable navigation
-    st.markdown("<br>", unsafe_allow_html=True)  # Add some spacing
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        login_clicked = st.button(
-            "🚀 Get Started - Login Here", 
-            key="hero_login_btn", 
-            help="Click to access login page", 
-            type="primary",
-            use_container_width=True
-        )
-        
-        if login_clicked:
-            # Always go to login page first
-            st.session_state.current_page = 'login'
-            st.rerun()
-    
-    # About Section
-    st.markdown("<br><br>", unsafe_allow_html=True)
+    <br>
+    """)
     
-    # About Section Header
-    st.markdown("""
+    show_hero_login_button()
+
+def render_landing_body():
+    """Display the About, feature and impact sections of the home page"""
+    # About header, description, feature cards and impact banner in one element
+    st.html(f"""
+    <br><br>
     <div style="
         background: rgba(255, 255, 255, 0.95);
         border-radius: 24px;
@@ -615,91 +683,18 @@ def show_hero_section():
             background-clip: text;
         ">📊 About DROPSAFE</h2>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Description using Streamlit markdown
-    st.markdown("""
+
     <div style="text-align: center; margin: 2rem 0;">
         <p style="font-size: 1.2rem; color: #475569; max-width: 800px; margin: 0 auto; line-height: 1.8;">
             DROPSAFE is an AI-powered early intervention system designed to help educational institutions identify students at risk of dropping out. Our comprehensive platform combines advanced machine learning algorithms with intuitive dashboards to provide actionable insights for students, teachers, and counselors.
         </p>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Features Section using Streamlit columns
-    st.markdown("### 🎯 Key Features")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div style="
-            background: white;
-            padding: 2rem 1.5rem;
-            border-radius: 16px;
-            text-align: center;
-            border: 1px solid rgba(13, 148, 136, 0.1);
-            box-shadow: 0 4px 16px rgba(15, 23, 42, 0.05);
-            margin-bottom: 1rem;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🎯</div>
-            <h3 style="font-size: 1.3rem; font-weight: 700; color: #0F172A; margin: 1rem 0 0.5rem 0;">Smart Risk Assessment</h3>
-            <p style="font-size: 1rem; line-height: 1.6; color: #64748B; margin: 0;">AI-powered analysis of attendance, grades, and fee status to identify at-risk students early.</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div style="
-            background: white;
-            padding: 2rem 1.5rem;
-            border-radius: 16px;
-            text-align: center;
-            border: 1px solid rgba(13, 148, 136, 0.1);
-            box-shadow: 0 4px 16px rgba(15, 23, 42, 0.05);
-            margin-bottom: 1rem;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">📈</div>
-            <h3 style="font-size: 1.3rem; font-weight: 700; color: #0F172A; margin: 1rem 0 0.5rem 0;">Real-time Analytics</h3>
-            <p style="font-size: 1rem; line-height: 1.6; color: #64748B; margin: 0;">Live monitoring and visualization of student performance metrics and trends.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div style="
-            background: white;
-            padding: 2rem 1.5rem;
-            border-radius: 16px;
-            text-align: center;
-            border: 1px solid rgba(13, 148, 136, 0.1);
-            box-shadow: 0 4px 16px rgba(15, 23, 42, 0.05);
-            margin-bottom: 1rem;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">👥</div>
-            <h3 style="font-size: 1.3rem; font-weight: 700; color: #0F172A; margin: 1rem 0 0.5rem 0;">Multi-Role Dashboards</h3>
-            <p style="font-size: 1rem; line-height: 1.6; color: #64748B; margin: 0;">Customized interfaces for students, teachers, and counselors with role-specific analytics.</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div style="
-            background: white;
-            padding: 2rem 1.5rem;
-            border-radius: 16px;
-            text-align: center;
-            border: 1px solid rgba(13, 148, 136, 0.1);
-            box-shadow: 0 4px 16px rgba(15, 23, 42, 0.05);
-            margin-bottom: 1rem;
-        ">
-            <div style="font-size: 3rem; margin-bottom: 1rem;">🔔</div>
-            <h3 style="font-size: 1.3rem; font-weight: 700; color: #0F172A; margin: 1rem 0 0.5rem 0;">Early Intervention</h3>
-            <p style="font-size: 1rem; line-height: 1.6; color: #64748B; margin: 0;">Automated alerts and personalized recommendations for timely support.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Impact Statistics Section
-    st.markdown("<br>", unsafe_allow_html=True)
-    st.markdown("""
+
+    <h3>🎯 Key Features</h3>
+
+    {FEATURE_GRID_HTML}
+
+    <br>
     <div style="
         background: linear-gradient(135deg, #0F172A 0%, #1E293B 50%, #0D9488 100%);
         border-radius: 20px;
@@ -710,7 +705,7 @@ def show_hero_section():
     ">
         <h3 style="font-size: 2rem; font-weight: 700; color: white; margin-bottom: 2rem;">Our Impact</h3>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
     # Statistics using Streamlit metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -731,12 +726,12 @@ def show_about_page():
     """Display the About Us page"""
     show_hero_section()
     
-    st.markdown("""
+    st.html("""
     <div class="main-header">
         <h1>ℹ️ About DROPSAFE</h1>
         <p>Transforming Education Through Intelligent Analytics</p>
     </div>
-    """, unsafe_allow_html=True)
+    """)
     
     col1, col2 = st.columns([2, 1])
     
@@ -762,7 +757,7 @@ def show_about_page():
         """)
     
     with col2:
-        st.markdown("""
+        st.html("""
         <div class="feature-card">
             <h3>🎓 For Students</h3>
             <p>Personal analytics and improvement recommendations</p>
@@ -777,7 +772,7 @@ def show_about_page():
             <h3>🧠 For Counselors</h3>
             <p>Advanced analytics and case management</p>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     st.markdown("""
     ### 🤝 Our Team
@@ -841,16 +836,14 @@ def show_registration_page():
                         # Show success and credentials
                         st.success("🎉 Account Created Successfully!")
                         
-                        st.markdown("""
-                        <div style="background: linear-gradient(135deg, #d4edda, #c3e6cb); 
-                                   color: #155724; padding: 2rem; border-radius: 15px; 
-                                   margin: 1rem 0; border-left: 5px solid #28a745;">
-                            <h3 style="margin-top: 0; color: #155724;">🔑 Your Login Credentials</h3>
-                            <p style="font-size: 1.1em; margin: 0.5rem 0;"><strong>Username:</strong> <code style="background: rgba(0,0,0,0.1); padding: 0.2rem 0.5rem; border-radius: 4px;">{}</code></p>
-                            <p style="font-size: 1.1em; margin: 0.5rem 0;"><strong>Password:</strong> <code style="background: rgba(0,0,0,0.1); padding: 0.2rem 0.5rem; border-radius: 4px;">{}</code></p>
-                            <p style="margin: 1rem 0 0 0; font-weight: 600;">⚠️ Please save these credentials securely. You will need them to log in.</p>
+                        st.markdown(f"""
+                        <div class="cred-card">
+                            <h3>🔑 Your Login Credentials</h3>
+                            <p><strong>Username:</strong> <code>{username}</code></p>
+                            <p><strong>Password:</strong> <code>{password}</code></p>
+                            <p class="cred-note">⚠️ Please save these credentials securely. You will need them to log in.</p>
                         </div>
-                        """.format(username, password), unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
                         
                         # Save success info for display outside form
                         st.session_state.temp_credentials = {'username': username, 'password': password}
@@ -921,6 +914,8 @@ def show_login_page():
                         success, user_data, message = authenticate_user(username, password)
                         if success and user_data is not None:
                             st.session_state.logged_in = True
+                            st.session_state.current_username = username
+                            st.session_state.current_user_data = user_data
                             st.session_state.selected_role = user_data['role']
                             st.session_state.current_page = 'dashboard'
                             st.success(f"Welcome {user_data['full_name']}! Redirecting to {user_data['role'].title()} Dashboard...")
@@ -961,16 +956,14 @@ def show_login_page():
                         success, result = reset_password(reset_username, reset_student_id)
                         if success:
                             st.success("✅ Password reset successful!")
-                            st.markdown("""
-                            <div style="background: linear-gradient(135deg, #d4edda, #c3e6cb); 
-                                       color: #155724; padding: 2rem; border-radius: 15px; 
-                                       margin: 1rem 0; border-left: 5px solid #28a745;">
-                                <h4 style="margin-top: 0; color: #155724;">🔑 Your New Password</h4>
-                                <p style="font-size: 1.1em; margin: 0.5rem 0;"><strong>Username:</strong> <code style="background: rgba(0,0,0,0.1); padding: 0.2rem 0.5rem; border-radius: 4px;">{}</code></p>
-                                <p style="font-size: 1.1em; margin: 0.5rem 0;"><strong>New Password:</strong> <code style="background: rgba(0,0,0,0.1); padding: 0.2rem 0.5rem; border-radius: 4px;">{}</code></p>
-                                <p style="margin: 1rem 0 0 0; font-weight: 600;">⚠️ Please save this new password securely. Use it to log in above.</p>
+                            st.markdown(f"""
+                            <div class="cred-card">
+                                <h4>🔑 Your New Password</h4>
+                                <p><strong>Username:</strong> <code>{reset_username}</code></p>
+                                <p><strong>New Password:</strong> <code>{result}</code></p>
+                                <p class="cred-note">⚠️ Please save this new password securely. Use it to log in above.</p>
                             </div>
-                            """.format(reset_username, result), unsafe_allow_html=True)
+                            """, unsafe_allow_html=True)
                         else:
                             st.error(f"❌ {result}")
                     else:
@@ -990,16 +983,13 @@ def show_login_page():
 # --- UTILITY FUNCTIONS ---
 def generate_credentials(full_name, student_id):
     """Generate unique username and password for new users"""
-    import random
-    import string
-    
     # Generate username: first part of name + last 4 digits of student ID
     name_part = full_name.split()[0].lower()[:6]
     id_part = str(student_id)[-4:] if len(str(student_id)) >= 4 else str(student_id)
     username = f"{name_part}{id_part}"
     
     # Generate random 8-character password
-    password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
+    password = secrets.token_urlsafe(6)
     
     return username, password
 
@@ -1015,24 +1005,140 @@ def store_user_credentials(username, password, full_name, email, student_id, rol
 
 def check_user_exists(student_id):
     """Check if user with given student ID already exists"""
-    for creds in st.session_state.user_credentials.values():
-        if creds.get('student_id') == student_id:
-            return True
-    return False
+    return student_id in st.session_state.get('student_id_index', {})
+
+def get_current_user(role):
+    """(username, user_data) of the logged-in user if they have this role, else (None, None)"""
+    user_data = st.session_state.get('current_user_data')
+    if st.session_state.get('logged_in') and user_data and user_data.get('role') == role:
+        return st.session_state.get('current_username'), user_data
+    return None, None
+
+DATETIME_DISPLAY_FORMAT = '%B %d, %Y at %I:%M %p'
+DATE_DISPLAY_FORMAT = '%B %d, %Y'
+
+def format_timestamp(timestamp, fmt=DATETIME_DISPLAY_FORMAT):
+    """Human-readable ISO timestamp, or the raw value if it doesn't parse"""
+    try:
+        return datetime.fromisoformat(timestamp).strftime(fmt)
+    except (TypeError, ValueError):
+        return timestamp
 
 # --- BACKEND STORAGE FUNCTIONS ---
+# scrypt work factors for stored passwords (~16 MB, a few tens of ms per hash)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+@st.cache_resource(show_spinner=False)
+def get_password_hasher():
+    """Shared argon2 hasher (salt and parameters are embedded in each hash)"""
+    return PasswordHasher()
+
+def scrypt_hash(password, salt):
+    """scrypt hash formatted as 'scrypt$<salt>$<hash>'"""
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=32)
+    return f"scrypt${salt.hex()}${digest.hex()}"
+
 def hash_password(password):
-    """Hash password for secure storage"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password for secure storage (argon2id, or salted scrypt without argon2-cffi)"""
+    if ARGON2_AVAILABLE:
+        return get_password_hasher().hash(password)
+    return scrypt_hash(password, os.urandom(16))
+
+def verify_password(password, stored_password):
+    """Check a password against a stored hash (argon2, scrypt or legacy unsalted sha256)"""
+    if stored_password.startswith('$argon2'):
+        if not ARGON2_AVAILABLE:
+            return False
+        try:
+            return get_password_hasher().verify(stored_password, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    if stored_password.startswith('scrypt$'):
+        _, salt_hex, _ = stored_password.split('$', 2)
+        candidate = scrypt_hash(password, bytes.fromhex(salt_hex))
+    else:
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(candidate, stored_password)
+
+def needs_rehash(stored_password):
+    """True when a stored hash is weaker than what hash_password writes today"""
+    if ARGON2_AVAILABLE:
+        if not stored_password.startswith('$argon2'):
+            return True
+        return get_password_hasher().check_needs_rehash(stored_password)
+    return not stored_password.startswith(('scrypt$', '$argon2'))
+
+def read_json_file(path):
+    """Read a JSON file, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def write_json_file(path, data):
+    """Atomically write data as indented JSON, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        payload = orjson.dumps(data, option=options)
+    else:
+        payload = json.dumps(data, indent=2).encode('utf-8')
+    # Write a sibling temp file and swap it in, so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def file_version(path):
+    """(mtime_ns, size) of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def read_json_cached(path, version):
+    """Parse a JSON file; re-read only when its file_version changes"""
+    return read_json_file(path)
 
 def load_users_from_file():
     """Load users from JSON file"""
     users_file = 'users_data.json'
-    if os.path.exists(users_file):
+    version = file_version(users_file)
+    if version is not None:
+        try:
+            return read_json_cached(users_file, version)
+        except (ValueError, FileNotFoundError):
+            return {}
+    return {}
+
+def build_student_id_index(users_data):
+    """Map student_id -> username"""
+    return {record.get('student_id'): username
+            for username, record in users_data.items() if record.get('student_id')}
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def read_student_id_index(path, version):
+    """Student ID index for a users file; rebuilt only when its file_version changes"""
+    return build_student_id_index(read_json_cached(path, version))
+
+def load_student_id_index():
+    """Student ID -> username index for the users on disk"""
+    users_file = 'users_data.json'
+    version = file_version(users_file)
+    if version is not None:
         try:
-            with open(users_file, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
+            return read_student_id_index(users_file, version)
+        except (ValueError, FileNotFoundError):
             return {}
     return {}
 
@@ -1040,8 +1146,7 @@ def save_users_to_file(users_data):
     """Save users to JSON file"""
     users_file = 'users_data.json'
     try:
-        with open(users_file, 'w') as f:
-            json.dump(users_data, f, indent=2)
+        write_json_file(users_file, users_data)
         return True
     except Exception as e:
         st.error(f"Error saving user data: {e}")
@@ -1057,9 +1162,8 @@ def register_user(username, password, full_name, email, student_id, role):
         return False, "Username already exists"
     
     # Check if student ID already exists
-    for user_data in users_data.values():
-        if user_data.get('student_id') == student_id:
-            return False, "Student ID already registered"
+    if student_id in load_student_id_index():
+        return False, "Student ID already registered"
     
     # Hash password for security
     hashed_password = hash_password(password)
@@ -1084,12 +1188,48 @@ def register_user(username, password, full_name, email, student_id, role):
         if 'user_credentials' not in st.session_state:
             st.session_state.user_credentials = {}
         st.session_state.user_credentials[username] = user_record
+        st.session_state.setdefault('student_id_index', {})[student_id] = username
         return True, "User registered successfully"
     else:
         return False, "Error saving user data"
 
+# Per-account attempt budget: at most this many tries per rolling window
+AUTH_ATTEMPT_LIMIT = 144
+AUTH_ATTEMPT_WINDOW = 24 * 60 * 60  # seconds
+
+@st.cache_resource(show_spinner=False)
+def get_attempt_log():
+    """Process-wide attempt timestamps per account key, shared by all sessions"""
+    return {'lock': threading.Lock(), 'attempts': {}, 'next_sweep': time.monotonic() + AUTH_ATTEMPT_WINDOW}
+
+def allow_attempt(key):
+    """Record an attempt for key; False once the key is over its budget"""
+    attempt_log = get_attempt_log()
+    now = time.monotonic()
+    with attempt_log['lock']:
+        log = attempt_log['attempts']
+        # Once per window, forget keys (e.g. made-up usernames) that have not been tried since
+        if now >= attempt_log['next_sweep']:
+            attempt_log['next_sweep'] = now + AUTH_ATTEMPT_WINDOW
+            for stale_key in [k for k, v in log.items() if v[-1] < now - AUTH_ATTEMPT_WINDOW]:
+                del log[stale_key]
+        attempts = log.get(key)
+        if attempts is None:
+            log[key] = deque([now])
+            return True
+        while attempts and attempts[0] < now - AUTH_ATTEMPT_WINDOW:
+            attempts.popleft()
+        if len(attempts) >= AUTH_ATTEMPT_LIMIT:
+            return False
+        attempts.append(now)
+        return True
+
 def authenticate_user(username, password):
     """Authenticate user against stored data"""
+    # Rejected before any file read or password hashing
+    if not allow_attempt(('login', username)):
+        return False, None, "Too many login attempts. Please try again later."
+    
     # Load users from file
     users_data = load_users_from_file()
     
@@ -1099,7 +1239,11 @@ def authenticate_user(username, password):
     
     # Check password
     stored_password = users_data[username]['password']
-    if hash_password(password) == stored_password:
+    if verify_password(password, stored_password):
+        # Upgrade legacy sha256 hashes on successful login
+        if needs_rehash(stored_password):
+            users_data[username]['password'] = hash_password(password)
+        
         # Update last login
         users_data[username]['last_login'] = datetime.now().isoformat()
         save_users_to_file(users_data)
@@ -1115,8 +1259,8 @@ def authenticate_user(username, password):
 
 def reset_password(username, student_id):
     """Reset password for a user after verification"""
-    import random
-    import string
+    if not allow_attempt(('reset', username)):
+        return False, "Too many reset attempts. Please try again later."
     
     # Load users from file
     users_data = load_users_from_file()
@@ -1130,7 +1274,7 @@ def reset_password(username, student_id):
         return False, "Student ID does not match our records"
     
     # Generate new password
-    new_password = ''.join(random.choices(string.ascii_letters + string.digits, k=8))
+    new_password = secrets.token_urlsafe(6)
     
     # Update password in data
     users_data[username]['password'] = hash_password(new_password)
@@ -1156,143 +1300,654 @@ def initialize_backend_data():
     else:
         # Merge with session state
         st.session_state.user_credentials.update(users_data)
+    st.session_state.student_id_index = load_student_id_index()
     
     # Initialize alerts system
     load_alerts_from_file()
 
 # --- ALERT MANAGEMENT FUNCTIONS ---
-def save_alerts_to_file():
-    """Save alerts to JSON file"""
-    alerts_file = 'student_alerts.json'
+# Alerts live in SQLite, indexed by (student_id, read), so reads and updates
+# touch only the matching rows instead of rewriting a whole JSON file
+ALERTS_DB = 'alerts.db'
+ALERT_TYPES = ['performance', 'attendance', 'fee', 'general']
+ALERT_COLUMNS = ['id', 'student_id', 'message', 'type', 'priority', 'sender', 'timestamp', 'read', 'responded']
+
+ALERTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id TEXT PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    message TEXT,
+    type TEXT,
+    priority TEXT,
+    sender TEXT,
+    timestamp TEXT,
+    read INTEGER NOT NULL DEFAULT 0,
+    responded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_student_read ON alerts (student_id, read);
+-- Lets the newest-first listing walk the index instead of sorting
+CREATE INDEX IF NOT EXISTS idx_alerts_student_time ON alerts (student_id, timestamp);
+"""
+
+def import_legacy_alerts(conn, alerts_file='student_alerts.json'):
+    """Copy alerts from the old JSON store into an empty alerts table"""
+    if not os.path.exists(alerts_file) or conn.execute("SELECT 1 FROM alerts LIMIT 1").fetchone():
+        return
     try:
-        alerts_data = {
-            'student_alerts': st.session_state.get('student_alerts', {}),
-            'alert_notifications': st.session_state.get('alert_notifications', [])
-        }
-        with open(alerts_file, 'w') as f:
-            json.dump(alerts_data, f, indent=2)
-        return True
-    except Exception as e:
-        st.error(f"Error saving alerts: {e}")
-        return False
+        alerts_data = read_json_file(alerts_file)
+    except ValueError:
+        return
+    # Older files kept every alert in 'alert_notifications'
+    records = alerts_data.get('alerts', alerts_data.get('alert_notifications', []))
+    conn.executemany(
+        f"INSERT OR IGNORE INTO alerts ({', '.join(ALERT_COLUMNS)}) VALUES ({', '.join('?' * len(ALERT_COLUMNS))})",
+        [(r.get('id'), str(r.get('student_id')), r.get('message'), r.get('type'), r.get('priority'),
+          r.get('sender'), r.get('timestamp'), int(bool(r.get('read'))), int(bool(r.get('responded'))))
+         for r in records if r.get('id')]
+    )
+
+@st.cache_resource(show_spinner=False)
+def get_alerts_db(path=ALERTS_DB):
+    """Shared SQLite connection for alerts plus the lock that serializes its use"""
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    with conn:
+        conn.executescript(ALERTS_SCHEMA)
+        import_legacy_alerts(conn)
+    return conn, threading.Lock()
+
+def alert_from_row(row):
+    """Alert dict in the shape the dashboards expect"""
+    alert = dict(row)
+    alert['read'] = bool(alert['read'])
+    alert['responded'] = bool(alert['responded'])
+    return alert
 
 def load_alerts_from_file():
-    """Load alerts from JSON file"""
-    alerts_file = 'student_alerts.json'
-    if os.path.exists(alerts_file):
-        try:
-            with open(alerts_file, 'r') as f:
-                alerts_data = json.load(f)
-                st.session_state.student_alerts = alerts_data.get('student_alerts', {})
-                st.session_state.alert_notifications = alerts_data.get('alert_notifications', [])
-        except (json.JSONDecodeError, FileNotFoundError):
-            st.session_state.student_alerts = {}
-            st.session_state.alert_notifications = []
-    else:
-        st.session_state.student_alerts = {}
-        st.session_state.alert_notifications = []
+    """Open the alerts database (creating or migrating it on first use)"""
+    get_alerts_db()
+
+ALERT_INSERT_SQL = f"INSERT INTO alerts ({', '.join(ALERT_COLUMNS)}) VALUES ({', '.join(':' + c for c in ALERT_COLUMNS)})"
+
+def send_alerts(entries, sender):
+    """Insert (student_id, message, alert_type, priority) alerts in one transaction; returns the new alert ids"""
+    now = datetime.now()
+    stamp = now.strftime('%Y%m%d_%H%M%S_%f')
+    timestamp = now.isoformat()
+    alerts = {}
+    for student_id, message, alert_type, priority in entries:
+        student_id = str(student_id)
+        # One alert per student per batch; a repeat would collide on the alert id
+        alerts.setdefault(student_id, {
+            'id': f"alert_{stamp}_{student_id}",
+            'student_id': student_id,
+            'message': message,
+            'type': alert_type,  # one of ALERT_TYPES
+            'priority': priority,  # 'High', 'Normal', 'Low'
+            'sender': sender,
+            'timestamp': timestamp,
+            'read': 0,
+            'responded': 0
+        })
+    
+    conn, lock = get_alerts_db()
+    with lock, conn:
+        conn.executemany(ALERT_INSERT_SQL, alerts.values())
+    
+    return [alert['id'] for alert in alerts.values()]
+
+def send_alerts_bulk(student_ids, message, alert_type, sender, priority="Normal"):
+    """Send the same alert to many students in one transaction; returns the new alert ids"""
+    return send_alerts(((student_id, message, alert_type, priority) for student_id in student_ids), sender)
 
 def send_alert_to_student(student_id, message, alert_type, sender, priority="Normal"):
     """Send an alert to a specific student"""
-    alert_id = f"alert_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{student_id}"
-    
-    alert = {
-        'id': alert_id,
-        'student_id': student_id,
-        'message': message,
-        'type': alert_type,  # 'performance', 'attendance', 'fee', 'general'
-        'priority': priority,  # 'High', 'Normal', 'Low'
-        'sender': sender,
-        'timestamp': datetime.now().isoformat(),
-        'read': False,
-        'responded': False
-    }
-    
-    # Add to student-specific alerts
-    if student_id not in st.session_state.student_alerts:
-        st.session_state.student_alerts[student_id] = []
-    
-    st.session_state.student_alerts[student_id].append(alert)
-    
-    # Add to general notifications
-    st.session_state.alert_notifications.append(alert)
-    
-    # Save to file
-    save_alerts_to_file()
-    
-    return alert_id
+    return send_alerts_bulk([student_id], message, alert_type, sender, priority)[0]
 
 def get_student_alerts(student_id):
     """Get all alerts for a specific student"""
-    return st.session_state.student_alerts.get(student_id, [])
+    conn, lock = get_alerts_db()
+    with lock:
+        rows = conn.execute(
+            "SELECT * FROM alerts WHERE student_id = ? ORDER BY timestamp", (str(student_id),)
+        ).fetchall()
+    return [alert_from_row(row) for row in rows]
 
-def mark_alert_as_read(student_id, alert_id):
-    """Mark an alert as read"""
-    if student_id in st.session_state.student_alerts:
-        for alert in st.session_state.student_alerts[student_id]:
-            if alert['id'] == alert_id:
-                alert['read'] = True
-                break
-    
-    # Update in notifications list
-    for alert in st.session_state.alert_notifications:
-        if alert['id'] == alert_id:
-            alert['read'] = True
-            break
-    
-    save_alerts_to_file()
+def mark_alerts_as_read(alert_ids):
+    """Mark several alerts as read in one transaction"""
+    conn, lock = get_alerts_db()
+    with lock, conn:
+        conn.executemany("UPDATE alerts SET read = 1 WHERE id = ?", [(alert_id,) for alert_id in alert_ids])
+
+def queue_alert_read(alert_id):
+    """Button callback: remember the alert until the next dashboard render"""
+    st.session_state.pending_read_alerts.add(alert_id)
+
+def flush_pending_reads():
+    """Apply every queued mark-as-read click in a single write"""
+    pending = st.session_state.pending_read_alerts
+    if pending:
+        mark_alerts_as_read(pending)
+        st.toast(f"{len(pending)} alert{'s' if len(pending) != 1 else ''} marked as read")
+        pending.clear()
+
+def get_alerts_view(student_id):
+    """A student's alerts newest first, with the unread count, from one query"""
+    conn, lock = get_alerts_db()
+    with lock:
+        rows = conn.execute(
+            "SELECT * FROM alerts WHERE student_id = ? ORDER BY timestamp DESC", (str(student_id),)
+        ).fetchall()
+    alerts = [alert_from_row(row) for row in rows]
+    return alerts, sum(not alert['read'] for alert in alerts)
 
 def get_unread_alerts_count(student_id):
     """Get count of unread alerts for a student"""
-    alerts = get_student_alerts(student_id)
-    return len([alert for alert in alerts if not alert['read']])
+    conn, lock = get_alerts_db()
+    with lock:
+        (count,) = conn.execute(
+            "SELECT COUNT(*) FROM alerts WHERE student_id = ? AND read = 0", (str(student_id),)
+        ).fetchone()
+    return count
+
+# --- ALERT CARD RENDERING ---
+# Styling lives in the .alert-card rules of get_css(); cards only carry class names
+ALERT_CARD_TEMPLATE = """
+<div class="{card_class}">
+    <div class="alert-card-head">
+        <h4>{type_emoji} {priority_emoji} {title} {label}{badge}</h4>
+        <span class="alert-card-time">{time}</span>
+    </div>
+    <p class="alert-card-message">{message}</p>
+    <p class="alert-card-sender">From: {sender}</p>
+</div>
+"""
+
+def split_template(template):
+    """Split a str.format template once into its literal chunks and field names"""
+    statics, fields = [], []
+    for literal, field, _, _ in string.Formatter().parse(template):
+        statics.append(literal)
+        if field is not None:
+            fields.append(field)
+    if len(statics) == len(fields):
+        statics.append('')
+    return tuple(statics), tuple(fields)
+
+def render_split_template(split, values):
+    """Interleave literal chunks with field values and join them in one pass"""
+    statics, fields = split
+    out = [None] * (len(statics) + len(fields))
+    out[0::2] = statics
+    out[1::2] = [str(values[field]) for field in fields]
+    return ''.join(out)
+
+ALERT_CARD_SPLIT = split_template(ALERT_CARD_TEMPLATE)
+
+ALERT_PRIORITIES = ('High', 'Normal', 'Low')
+# Card classes keyed by (priority, is_read); read cards share one muted look
+ALERT_CARD_CLASSES = {
+    (priority, is_read): f"alert-card alert-card--{priority.lower()}{' is-read' if is_read else ''}"
+    for priority in ALERT_PRIORITIES for is_read in (False, True)
+}
+ALERT_TYPE_EMOJI = {'performance': '📊', 'attendance': '📅', 'fee': '💰', 'general': '📢'}
+ALERT_PRIORITY_EMOJI = {'High': '🚨', 'Normal': '⚠️', 'Low': 'ℹ️'}
+ALERT_BADGES = {
+    True: '<span class="alert-badge alert-badge--read">READ</span>',
+    False: '<span class="alert-badge alert-badge--new">NEW</span>',
+}
+# Which filtered tab each alert type belongs to
+ALERT_TAB_BUCKETS = {'performance': 'performance', 'attendance': 'performance', 'fee': 'notice', 'general': 'notice'}
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def alert_card_html(alert_id, alert_type, priority, is_read, timestamp, message, sender, label):
+    """Finished card HTML for one alert; cached per alert and read state"""
+    # Unknown priorities are styled as Low
+    style_priority = priority if priority in ALERT_PRIORITIES else 'Low'
+    return render_split_template(ALERT_CARD_SPLIT, {
+        'card_class': ALERT_CARD_CLASSES[(style_priority, is_read)],
+        'type_emoji': ALERT_TYPE_EMOJI.get(alert_type, '📢'),
+        'priority_emoji': ALERT_PRIORITY_EMOJI.get(priority, 'ℹ️'),
+        'title': alert_type.title(),
+        'label': label,
+        'badge': ALERT_BADGES[is_read],
+        'time': format_timestamp(timestamp),
+        'message': message,
+        'sender': sender,
+    })
+
+def render_alert_card(alert, key_prefix, label='Alert'):
+    """Render one alert card and, while unread, its mark-as-read button"""
+    is_read = bool(alert['read'])
+    st.markdown(alert_card_html(
+        alert['id'], alert['type'], alert['priority'], is_read,
+        alert['timestamp'], alert['message'], alert['sender'], label
+    ), unsafe_allow_html=True)
+    
+    if not is_read:
+        col1, col2, col3 = st.columns([1, 1, 4])
+        with col1:
+            # Queued by the callback and written at the top of the next render
+            st.button("✅ Mark as Read", key=f"{key_prefix}_{alert['id']}",
+                      on_click=queue_alert_read, args=(alert['id'],))
+
+def render_alert_tab(heading, alerts, key_prefix, label='Alert', empty_message=None):
+    """Render one alerts tab: a heading, then its cards or an empty-state note"""
+    st.markdown(heading)
+    for alert in alerts:
+        render_alert_card(alert, key_prefix, label)
+    if not alerts and empty_message:
+        st.info(empty_message)
+
+# --- PROFILE CARD RENDERING ---
+PROFILE_CARD_TEMPLATE = """
+<div style="
+    background: rgba(255, 255, 255, 0.95);
+    padding: 2rem;
+    border-radius: 15px;
+    border: 1px solid rgba(13, 148, 136, 0.2);
+    box-shadow: 0 4px 16px rgba(15, 23, 42, 0.1);
+">
+    <h4 style="color: #0F172A; margin-top: 0;">Personal Information</h4>
+    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; margin-bottom: 1rem;">
+        <div>
+            <strong style="color: #0D9488;">Full Name:</strong><br>
+            <span style="color: #475569;">{full_name}</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Student ID:</strong><br>
+            <span style="color: #475569;">{student_id}</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Username:</strong><br>
+            <span style="color: #475569;">{username}</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Academic Year:</strong><br>
+            <span style="color: #475569;">2024-2025</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Email:</strong><br>
+            <span style="color: #475569;">{email}</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Program:</strong><br>
+            <span style="color: #475569;">Bachelor of Science</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Registration Date:</strong><br>
+            <span style="color: #475569;">{created_date}</span>
+        </div>
+        <div>
+            <strong style="color: #0D9488;">Last Login:</strong><br>
+            <span style="color: #475569;">{last_login_date}</span>
+        </div>
+    </div>
+</div>
+"""
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_profile_card(full_name, email, student_id, username, created_date, last_login_date):
+    """Finished Personal Information card HTML; only changes when the user's details do"""
+    return PROFILE_CARD_TEMPLATE.format(
+        full_name=full_name, email=email, student_id=student_id, username=username,
+        created_date=created_date, last_login_date=last_login_date,
+    )
+
+def read_excel_fast(file, usecols=None):
+    """Read an Excel upload, preferring the Rust calamine reader when installed"""
+    return pd.read_excel(file, usecols=usecols, engine=EXCEL_ENGINE)
+
+def upload_digest(*files):
+    """Content hash of a set of uploaded files"""
+    digest = hashlib.blake2b(digest_size=16)
+    for file in files:
+        digest.update(file.getvalue())
+    return digest.hexdigest()
+
+def prune_merged_cache():
+    """Delete merged-upload files past MERGED_CACHE_TTL or beyond the newest MERGED_CACHE_MAX_FILES"""
+    try:
+        entries = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(MERGED_CACHE_DIR)
+                   if entry.name.startswith('merged_') and entry.name.endswith('.parquet')]
+    except OSError:
+        return
+    cutoff = time.time() - MERGED_CACHE_TTL
+    for rank, (mtime, path) in enumerate(sorted(entries, reverse=True)):
+        if rank >= MERGED_CACHE_MAX_FILES or mtime < cutoff:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
-@st.cache_data
+def downcast_numeric(df):
+    """Shrink integer measure columns to the smallest dtype that holds their values"""
+    # Student_ID stays as loaded: it keys alerts and must round-trip through JSON.
+    # Floats stay float64: float32 prints 78.2 as 78.19999694824219 and shifts band thresholds
+    measures = df.drop(columns='Student_ID')
+    for col in measures.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    return df
+
+@st.cache_data(ttl=MERGED_CACHE_TTL, show_spinner=False)
 def load_and_merge_data(att_file, sc_file, fee_file):
     try:
-        df_att = pd.read_excel(att_file)
-        df_sc = pd.read_excel(sc_file)
-        df_fee = pd.read_excel(fee_file)
-        return df_att.merge(df_sc, on='Student_ID').merge(df_fee, on='Student_ID')
+        # Identical uploads reuse the merged frame saved by an earlier run, unless it has expired
+        prune_merged_cache()
+        cache_path = os.path.join(MERGED_CACHE_DIR, f"merged_{upload_digest(att_file, sc_file, fee_file)}.parquet")
+        if os.path.exists(cache_path):
+            return pd.read_parquet(cache_path)
+        
+        # Parse only the columns the dashboards use
+        df_att = read_excel_fast(att_file, usecols=['Student_ID', 'Attendance'])
+        df_sc = read_excel_fast(sc_file, usecols=['Student_ID', 'Test_Score'])
+        df_fee = read_excel_fast(fee_file, usecols=['Student_ID', 'Fee_Status'])
+        merged = downcast_numeric(df_att.merge(df_sc, on='Student_ID').merge(df_fee, on='Student_ID'))
+        
+        try:
+            os.makedirs(MERGED_CACHE_DIR, exist_ok=True)
+            merged.to_parquet(cache_path, index=False)
+        except (ImportError, OSError):
+            pass  # No parquet engine or read-only disk: the in-memory cache still applies
+        return merged
     except Exception as e:
         st.error(f"Error: {e}")
         return None
 
-def calculate_risk_score(row):
-    score = 0
-    if row['Attendance'] < 70: score += 4
-    elif row['Attendance'] < 80: score += 2
-    if row['Test_Score'] < 40: score += 3
-    elif row['Test_Score'] < 60: score += 1.5
-    fee_status = str(row['Fee_Status']).lower()
-    if 'overdue' in fee_status: score += 3
-    elif 'pending' in fee_status: score += 1.5
-    return round(score, 1)
+def calculate_risk_score(df):
+    """Rule-based risk score for every row, computed column-wise (needs Fee_Status_Lower)"""
+    attendance = df['Attendance'].to_numpy()
+    test_score = df['Test_Score'].to_numpy()
+    fee_status = df['Fee_Status_Lower']
+    score = (
+        np.select([attendance < 70, attendance < 80], [4.0, 2.0], default=0.0)
+        + np.select([test_score < 40, test_score < 60], [3.0, 1.5], default=0.0)
+        + np.select(
+            [fee_status.str.contains('overdue', regex=False).to_numpy(),
+             fee_status.str.contains('pending', regex=False).to_numpy()],
+            [3.0, 1.5], default=0.0)
+    )
+    return np.round(score, 1)
+
+# Fee statuses that need a payment reminder
+FEE_REMINDER_STATUSES = frozenset(('pending', 'overdue'))
+
+def recommendation(title, message, rec_type):
+    """One recommendation card"""
+    return {'title': title, 'message': message, 'type': rec_type}
+
+@st.cache_data(show_spinner=False)
+def build_recommendations(df):
+    """Recommendation cards for every student, flagged column-wise (needs Fee_Status_Lower)"""
+    attendance = df['Attendance']
+    test_score = df['Test_Score']
+    fee_status = df['Fee_Status_Lower']
+    low_attendance = (attendance < 80).to_numpy()
+    low_score = (test_score < 70).to_numpy()
+    fee_due = fee_status.isin(FEE_REMINDER_STATUSES).to_numpy()
+    attendance_type = np.where(attendance < 70, 'warning', 'info')
+    fee_type = np.where(fee_status == 'overdue', 'danger', 'warning')
+    attendance_text = attendance.astype(str).to_numpy()
+    score_text = test_score.astype(str).to_numpy()
+    
+    all_good = [recommendation('🎉 Great Job!', "You're doing well! Keep it up!", 'success')]
+    recs = []
+    # Per-row work is limited to assembling the cards the masks already selected
+    for i in range(len(df)):
+        row = []
+        if low_attendance[i]:
+            row.append(recommendation('📈 Improve Attendance',
+                                      f"Your attendance is {attendance_text[i]}%. Aim for 85%+", attendance_type[i]))
+        if low_score[i]:
+            row.append(recommendation('📚 Academic Support',
+                                      f"Test score: {score_text[i]}. Consider tutoring", 'warning'))
+        if fee_due[i]:
+            row.append(recommendation('💰 Fee Payment', "Please resolve your fee status", fee_type[i]))
+        recs.append(row or all_good)
+    return pd.Series(recs, index=df.index, dtype=object)
+
+DEFAULT_ALERT_MESSAGE = "We've noticed some areas where you could improve. Please see me for a discussion."
+
+@st.cache_data(show_spinner=False)
+def suggested_alert_messages(df):
+    """Pre-filled teacher alert text for every student, built column-wise (needs Fee_Status_Lower)"""
+    empty = pd.Series('', index=df.index)
+    attendance_msg = ("Your attendance is " + df['Attendance'].astype(str)
+                      + "%, which is below the required minimum. Please improve your class attendance. ")
+    score_msg = ("Your recent test score of " + df['Test_Score'].astype(str)
+                 + " indicates academic difficulties. Please consider additional study support. ")
+    fee_msg = ("Your fee status is " + df['Fee_Status'].astype(str)
+               + ". Please resolve this at the earliest. ")
+    message = (attendance_msg.where(df['Attendance'] < 70, empty)
+               + score_msg.where(df['Test_Score'] < 50, empty)
+               + fee_msg.where(df['Fee_Status_Lower'].isin(FEE_REMINDER_STATUSES), empty))
+    return message.mask(message == '', DEFAULT_ALERT_MESSAGE)
+
+@st.cache_data(show_spinner=False)
+def intervention_issues(df):
+    """Issue summary for the counselor's intervention cards, built column-wise (needs Fee_Status_Lower)"""
+    empty = pd.Series('', index=df.index)
+    attendance_issue = "Low Attendance (" + df['Attendance'].astype(str) + "%) "
+    score_issue = "Poor Performance (" + df['Test_Score'].astype(str) + ") "
+    fee_issue = "Fee Issues (" + df['Fee_Status'].astype(str) + ")"
+    return (attendance_issue.where(df['Attendance'] < 70, empty)
+            + score_issue.where(df['Test_Score'] < 50, empty)
+            + fee_issue.where(df['Fee_Status_Lower'] != 'paid', empty))
+
+# Final_Risk categories, lowest to highest
+RISK_LEVELS = ['Low Risk', 'Medium Risk', 'High Risk', 'Very High Risk']
+
+# Model input columns, in training order
+ML_FEATURES = ['Attendance', 'Test_Score', 'Fee_Status_Code']
+# Fee statuses in the order of the model's Fee_Status_Code encoding
+FEE_STATUS_LEVELS = ['paid', 'pending', 'overdue']
+# Working columns process_data adds for scoring; never shown in tables or exports
+HELPER_COLUMNS = ['Fee_Status_Lower', 'Fee_Status_Cat']
+
+MODEL_PATH = 'dropout_model.joblib'
+ONNX_MODEL_PATH = 'dropout_model.onnx'
+
+@st.cache_resource(show_spinner=False)
+def load_model(path, version):
+    """Load the dropout model once per file version and share it across sessions."""
+    # joblib (and sklearn, pulled in by unpickling) load on first prediction
+    import joblib
+    return joblib.load(path)
+
+@st.cache_resource(show_spinner=False)
+def load_onnx_session(path, version, source_version):
+    """ONNX Runtime session for the exported model, or None to use sklearn"""
+    if not ONNXRUNTIME_AVAILABLE or version is None:
+        return None
+    # Ignore an export that predates the joblib model it was made from
+    if source_version is not None and version[0] < source_version[0]:
+        return None
+    import onnxruntime as ort
+    return ort.InferenceSession(path, providers=['CPUExecutionProvider'])
 
 def predict_with_ml(df):
     try:
-        model = joblib.load('dropout_model.joblib')
-        status_map = {'paid': 0, 'pending': 1, 'overdue': 2}
-        df['Fee_Status_Code'] = df['Fee_Status'].astype(str).str.lower().map(status_map).fillna(0)
-        features = df[['Attendance', 'Test_Score', 'Fee_Status_Code']].fillna(0)
-        predictions = model.predict(features)
-        return ['High Risk' if p == 1 else 'Low Risk' for p in predictions]
+        # Keyed on file versions so retraining is picked up without a restart
+        model_version = file_version(MODEL_PATH)
+        session = load_onnx_session(ONNX_MODEL_PATH, file_version(ONNX_MODEL_PATH), model_version)
+        # Filled column by column into one float32 block, the trees' native dtype
+        features = np.empty((len(df), len(ML_FEATURES)), dtype=np.float32)
+        features[:, 0] = df['Attendance'].fillna(0).to_numpy()
+        features[:, 1] = df['Test_Score'].fillna(0).to_numpy()
+        # Category codes are the model's encoding; unknown statuses (-1) count as paid
+        features[:, 2] = df['Fee_Status_Cat'].cat.codes.clip(lower=0).to_numpy()
+        # One predict call for the whole frame; labels mapped without a Python loop
+        if session is not None:
+            input_name = session.get_inputs()[0].name
+            predictions = session.run(None, {input_name: features})[0]
+        else:
+            # The model was fitted with column names; this frame wraps the array without copying
+            predictions = load_model(MODEL_PATH, model_version).predict(
+                pd.DataFrame(features, columns=ML_FEATURES, copy=False))
+        return np.where(predictions == 1, 'High Risk', 'Low Risk')
     except:
-        return ['Rule-Based'] * len(df)
+        return np.full(len(df), 'Rule-Based')
 
+@st.cache_data(show_spinner=False)
 def process_data(df):
     if df is None: return None
-    df['Rule_Score'] = df.apply(calculate_risk_score, axis=1)
+    # Lower-cased once per distinct status, then mapped back through the codes
+    raw_status = pd.Categorical(df['Fee_Status'].astype(str))
+    lower_levels = raw_status.categories.str.lower()
+    status_levels = pd.Index(lower_levels.unique())
+    status_codes = np.where(raw_status.codes >= 0,
+                            status_levels.get_indexer(lower_levels)[raw_status.codes], -1)
+    df['Fee_Status_Lower'] = pd.Categorical.from_codes(status_codes, status_levels)
+    df['Fee_Status_Cat'] = df['Fee_Status_Lower'].cat.set_categories(FEE_STATUS_LEVELS)
+    df['Rule_Score'] = calculate_risk_score(df)
     df['ML_Prediction'] = predict_with_ml(df)
     conditions = [
         (df['Rule_Score'] >= 7) & (df['ML_Prediction'] == 'High Risk'),
         (df['Rule_Score'] >= 6),
         (df['Rule_Score'] >= 3) | (df['ML_Prediction'] == 'High Risk')
     ]
-    choices = ['Very High Risk', 'High Risk', 'Medium Risk']
-    df['Final_Risk'] = np.select(conditions, choices, default='Low Risk')
+    # int8 codes into RISK_LEVELS instead of an object column of strings
+    codes = np.select(conditions, [3, 2, 1], default=0).astype(np.int8)
+    df['Final_Risk'] = pd.Categorical.from_codes(codes, categories=RISK_LEVELS, ordered=True)
     return df
 
+# --- DASHBOARD AGGREGATES ---
+# Cached on the processed frame, so reruns from widget clicks skip the column scans
+RISK_COLORS = {
+    'Very High Risk': '#ff6b6b',
+    'High Risk': '#ff9f43',
+    'Medium Risk': '#ffa726',
+    'Low Risk': '#66bb6a'
+}
+
+# Legend/axis order for every risk-coloured figure, highest risk first
+RISK_CATEGORY_ORDERS = {'Final_Risk': RISK_LEVELS[::-1]}
+
+# Table cell styles for each Final_Risk level
+RISK_CELL_STYLES = {
+    'Very High Risk': 'background-color: #ffebee; color: #c62828;',
+    'High Risk': 'background-color: #fff3e0; color: #ef6c00;',
+    'Medium Risk': 'background-color: #fff8e1; color: #f57f17;',
+    'Low Risk': 'background-color: #e8f5e8; color: #2e7d32;'
+}
+
+def risk_cell_styles(col):
+    """Styler.apply callback: CSS for a whole Final_Risk column in one mapping"""
+    return col.astype(object).map(RISK_CELL_STYLES).fillna('')
+
+@st.cache_data(show_spinner=False)
+def dashboard_aggregates(df):
+    """Counts, averages and at-risk subsets shared by the student, teacher and counselor dashboards"""
+    risk_counts = df['Final_Risk'].value_counts()
+    very_high = int(risk_counts.get('Very High Risk', 0))
+    high = int(risk_counts.get('High Risk', 0))
+    by_score = df.sort_values('Rule_Score', ascending=False)
+    return {
+        'total': len(df),
+        'very_high': very_high,
+        'high': high,
+        'high_risk': very_high + high,
+        'avg_attendance': float(df['Attendance'].mean()),
+        'avg_score': float(df['Test_Score'].mean()),
+        'overdue_fees': int((df['Fee_Status_Lower'] == 'overdue').sum()),
+        'low_attendance': int((df['Attendance'] < 70).sum()),
+        # Highest Rule_Score first
+        'at_risk': by_score[by_score['Final_Risk'].isin(['Very High Risk', 'High Risk'])],
+        'priority': by_score[by_score['Final_Risk'] == 'Very High Risk'],
+        'risk_fee': pd.crosstab(df['Fee_Status'], df['Final_Risk']),
+    }
+
+# Figures are cached per frame too; st.cache_data hands each rerun its own copy
+@st.cache_data(show_spinner=False)
+def risk_distribution_pie(df, title="Class Risk Distribution"):
+    """Pie chart of Final_Risk counts"""
+    import plotly.express as px
+    return px.pie(df['Final_Risk'].value_counts().reset_index(),
+                  values='count', names='Final_Risk',
+                  title=title,
+                  category_orders=RISK_CATEGORY_ORDERS,
+                  color_discrete_map=RISK_COLORS)
+
+# Beyond this many points the scatter is pure overplotting; larger uploads are sampled
+SCATTER_MAX_POINTS = 3000
+
+@st.cache_data(show_spinner=False)
+def attendance_score_scatter(df):
+    """Attendance vs test score, coloured by risk and sized by Rule_Score"""
+    import plotly.express as px
+    title = "Attendance vs Test Score"
+    if len(df) > SCATTER_MAX_POINTS:
+        # Same fraction from every risk level, so the mix of colours is preserved
+        df = df.groupby('Final_Risk', observed=True, group_keys=False).sample(
+            frac=SCATTER_MAX_POINTS / len(df), random_state=0)
+        title += f" (sample of {len(df):,} students)"
+    return px.scatter(df, x='Attendance', y='Test_Score',
+                      color='Final_Risk', size='Rule_Score',
+                      render_mode='webgl',
+                      title=title,
+                      category_orders=RISK_CATEGORY_ORDERS,
+                      color_discrete_map=RISK_COLORS)
+
+@st.cache_data(show_spinner=False)
+def risk_by_fee_bar(risk_fee):
+    """Stacked bar of a Fee_Status x Final_Risk crosstab"""
+    import plotly.express as px
+    return px.bar(risk_fee.reset_index().melt(id_vars='Fee_Status'),
+                  x='Fee_Status', y='value', color='Final_Risk',
+                  title="Risk Distribution by Fee Status",
+                  category_orders=RISK_CATEGORY_ORDERS,
+                  color_discrete_map=RISK_COLORS)
+
+@st.cache_data(show_spinner=False)
+def attendance_by_risk_box(df):
+    """Attendance spread per risk level"""
+    import plotly.express as px
+    return px.box(df, x='Final_Risk', y='Attendance',
+                  title="Attendance Distribution by Risk Level",
+                  category_orders=RISK_CATEGORY_ORDERS)
+
+@st.cache_data(show_spinner=False)
+def risk_histogram(df, column, title):
+    """Histogram of one column, stacked by risk level"""
+    import plotly.express as px
+    return px.histogram(df, x=column, color='Final_Risk', title=title, nbins=20,
+                        category_orders=RISK_CATEGORY_ORDERS,
+                        color_discrete_map=RISK_COLORS)
+
+@st.cache_data(show_spinner=False)
+def student_id_options(df):
+    """Sorted distinct Student_IDs for the ID selectbox"""
+    return sorted(df['Student_ID'].unique().tolist())
+
+@st.cache_data(show_spinner=False)
+def student_row_positions(df):
+    """Student_ID -> row position of its first occurrence, for O(1) row lookups"""
+    ids = df['Student_ID'].tolist()
+    # Built back to front so duplicate IDs keep their first position
+    return dict(zip(reversed(ids), range(len(ids) - 1, -1, -1)))
+
+@st.cache_data(show_spinner=False)
+def risk_levels_present(df):
+    """Final_Risk levels that occur in the data, lowest to highest"""
+    return df['Final_Risk'].cat.remove_unused_categories().cat.categories.tolist()
+
+def display_columns(df):
+    """Columns of a processed frame that are shown to users, without the scoring helpers"""
+    return [col for col in df.columns if col not in HELPER_COLUMNS]
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    """UTF-8 CSV export of a frame, without the index or the scoring helper columns"""
+    # Written straight into a bytes buffer, skipping the intermediate str and its encode
+    buffer = io.BytesIO()
+    df.to_csv(buffer, index=False, encoding='utf-8', columns=display_columns(df))
+    return buffer.getvalue()
+
+@st.cache_data(show_spinner=False)
+def summary_csv_bytes(df):
+    """UTF-8 CSV of the frame's describe() summary"""
+    return df.describe().to_csv().encode('utf-8')
+
 # --- DATA UPLOAD ---
 def show_upload():
     st.sidebar.markdown("""
@@ -1383,6 +2038,34 @@ def show_footer():
 
 
 # --- STUDENT DASHBOARD ---
+# Empty-state panels
+EMPTY_ALERTS_HTML = """
+<div style="
+    background: linear-gradient(135deg, #e8f5e8 0%, #c3e6cb 100%);
+    color: #155724;
+    padding: 2rem;
+    border-radius: 15px;
+    margin: 1rem 0;
+    text-align: center;
+    border-left: 5px solid #28a745;
+">
+    <h3 style="margin: 0 0 0.5rem 0; color: #155724;">📢 No New Alerts</h3>
+    <p style="margin: 0; opacity: 0.8;">You're all caught up! No new notifications from your teachers.</p>
+</div>
+"""
+
+NO_STUDENT_DATA_HTML = """
+<div class="alert-warning">
+    <h3>📁 No Data Available</h3>
+    <p>No academic data has been uploaded yet. Please ask your teachers or counselors to upload the institutional data files to view your dashboard analytics.</p>
+    <ul>
+        <li>Teachers can upload class performance data</li>
+        <li>Counselors can upload institution-wide analytics</li>
+        <li>Once uploaded, your personal analytics will appear here</li>
+    </ul>
+</div>
+"""
+
 def show_student_dashboard():
     st.markdown("""
     <div class="main-header">
@@ -1395,24 +2078,18 @@ def show_student_dashboard():
         st.session_state.selected_role = None
         st.rerun()
     
-    # Get current student ID for alerts
-    current_student_id = None
-    current_user_data = None
-    current_username = None
-    if st.session_state.get('logged_in') and 'user_credentials' in st.session_state:
-        for username, user_data in st.session_state.user_credentials.items():
-            if user_data.get('role') == 'student':
-                current_user_data = user_data
-                current_username = username
-                current_student_id = user_data.get('student_id')
-                break
+    # Get current student ID for alerts (identity is stored at login)
+    current_username, current_user_data = get_current_user('student')
+    current_student_id = current_user_data.get('student_id') if current_user_data else None
     
     # Notices & Alerts Section - Priority placement at top
     if current_student_id:
-        student_alerts = get_student_alerts(current_student_id)
-        unread_count = get_unread_alerts_count(current_student_id)
+        flush_pending_reads()
         
-        if student_alerts:
+        # Newest first, with the unread count taken from the same rows
+        sorted_alerts, unread_count = get_alerts_view(current_student_id)
+        
+        if sorted_alerts:
             # Show alert banner if there are unread alerts
             if unread_count > 0:
                 st.markdown(f"""
@@ -1437,213 +2114,29 @@ def show_student_dashboard():
             # Create tabs for different alert types
             alert_tab1, alert_tab2, alert_tab3 = st.tabs(["🚨 All Alerts", "📊 Performance Alerts", "📅 Other Notices"])
             
+            # Split into the filtered tabs in one pass; other types only appear under All
+            alert_buckets = {'performance': [], 'notice': []}
+            for alert in sorted_alerts:
+                bucket = ALERT_TAB_BUCKETS.get(alert['type'])
+                if bucket:
+                    alert_buckets[bucket].append(alert)
+            
             with alert_tab1:
-                st.markdown("#### 📋 All Notifications")
-                
-                # Sort alerts by timestamp (newest first)
-                sorted_alerts = sorted(student_alerts, key=lambda x: x['timestamp'], reverse=True)
-                
-                for alert in sorted_alerts:
-                    # Determine alert styling based on priority and read status
-                    if not alert['read']:
-                        border_color = "#ff6b6b" if alert['priority'] == 'High' else "#ffa726" if alert['priority'] == 'Normal' else "#66bb6a"
-                        bg_gradient = "linear-gradient(135deg, #fff5f5 0%, #ffeaa7 100%)" if alert['priority'] == 'High' else "linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%)"
-                    else:
-                        border_color = "#e9ecef"
-                        bg_gradient = "linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%)"
-                    
-                    # Format timestamp
-                    try:
-                        from datetime import datetime as dt
-                        alert_time = dt.fromisoformat(alert['timestamp']).strftime('%B %d, %Y at %I:%M %p')
-                    except:
-                        alert_time = alert['timestamp']
-                    
-                    # Alert type emoji
-                    type_emoji = {
-                        'performance': '📊',
-                        'attendance': '📅', 
-                        'fee': '💰',
-                        'general': '📢'
-                    }.get(alert['type'], '📢')
-                    
-                    # Priority emoji
-                    priority_emoji = {
-                        'High': '🚨',
-                        'Normal': '⚠️',
-                        'Low': 'ℹ️'
-                    }.get(alert['priority'], 'ℹ️')
-                    
-                    st.markdown(f"""
-                    <div style="
-                        background: {bg_gradient};
-                        border-left: 4px solid {border_color};
-                        padding: 1.5rem;
-                        border-radius: 12px;
-                        margin: 1rem 0;
-                        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-                        {'opacity: 0.7;' if alert['read'] else ''}
-                    ">
-                        <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 0.5rem;">
-                            <h4 style="margin: 0; color: #0F172A;">
-                                {type_emoji} {priority_emoji} {alert['type'].title()} Alert
-                                {'<span style="background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">READ</span>' if alert['read'] else '<span style="background: #dc3545; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">NEW</span>'}
-                            </h4>
-                            <span style="font-size: 0.9rem; color: #6c757d;">{alert_time}</span>
-                        </div>
-                        <p style="margin: 0.5rem 0; color: #495057; line-height: 1.5;">{alert['message']}</p>
-                        <p style="margin: 0; font-size: 0.9rem; color: #6c757d;">From: {alert['sender']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Mark as read button for unread alerts
-                    if not alert['read']:
-                        col1, col2, col3 = st.columns([1, 1, 4])
-                        with col1:
-                            if st.button(f"✅ Mark as Read", key=f"read_{alert['id']}"):
-                                mark_alert_as_read(current_student_id, alert['id'])
-                                st.success("Alert marked as read!")
-                                st.rerun()
+                render_alert_tab("#### 📋 All Notifications", sorted_alerts, 'read')
             
             with alert_tab2:
-                st.markdown("#### 📊 Performance & Academic Alerts")
-                performance_alerts = [alert for alert in sorted_alerts if alert['type'] in ['performance', 'attendance']]
-                
-                if performance_alerts:
-                    for alert in performance_alerts:
-                        # Same styling as above but filtered for performance alerts
-                        if not alert['read']:
-                            border_color = "#ff6b6b" if alert['priority'] == 'High' else "#ffa726"
-                            bg_gradient = "linear-gradient(135deg, #fff5f5 0%, #ffeaa7 100%)" if alert['priority'] == 'High' else "linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%)"
-                        else:
-                            border_color = "#e9ecef"
-                            bg_gradient = "linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%)"
-                        
-                        try:
-                            from datetime import datetime as dt
-                            alert_time = dt.fromisoformat(alert['timestamp']).strftime('%B %d, %Y at %I:%M %p')
-                        except:
-                            alert_time = alert['timestamp']
-                        
-                        type_emoji = '📊' if alert['type'] == 'performance' else '📅'
-                        priority_emoji = '🚨' if alert['priority'] == 'High' else '⚠️' if alert['priority'] == 'Normal' else 'ℹ️'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_gradient};
-                            border-left: 4px solid {border_color};
-                            padding: 1.5rem;
-                            border-radius: 12px;
-                            margin: 1rem 0;
-                            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-                            {'opacity: 0.7;' if alert['read'] else ''}
-                        ">
-                            <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 0.5rem;">
-                                <h4 style="margin: 0; color: #0F172A;">
-                                    {type_emoji} {priority_emoji} {alert['type'].title()} Alert
-                                    {'<span style="background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">READ</span>' if alert['read'] else '<span style="background: #dc3545; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">NEW</span>'}
-                                </h4>
-                                <span style="font-size: 0.9rem; color: #6c757d;">{alert_time}</span>
-                            </div>
-                            <p style="margin: 0.5rem 0; color: #495057; line-height: 1.5;">{alert['message']}</p>
-                            <p style="margin: 0; font-size: 0.9rem; color: #6c757d;">From: {alert['sender']}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        if not alert['read']:
-                            col1, col2, col3 = st.columns([1, 1, 4])
-                            with col1:
-                                if st.button(f"✅ Mark as Read", key=f"perf_read_{alert['id']}"):
-                                    mark_alert_as_read(current_student_id, alert['id'])
-                                    st.success("Alert marked as read!")
-                                    st.rerun()
-                else:
-                    st.info("📊 No performance alerts at this time. Keep up the good work!")
+                render_alert_tab("#### 📊 Performance & Academic Alerts", alert_buckets['performance'], 'perf_read',
+                                 empty_message="📊 No performance alerts at this time. Keep up the good work!")
             
             with alert_tab3:
-                st.markdown("#### 📢 General Notices")
-                other_alerts = [alert for alert in sorted_alerts if alert['type'] in ['fee', 'general']]
-                
-                if other_alerts:
-                    for alert in other_alerts:
-                        # Same styling pattern
-                        if not alert['read']:
-                            border_color = "#ff6b6b" if alert['priority'] == 'High' else "#ffa726"
-                            bg_gradient = "linear-gradient(135deg, #fff5f5 0%, #ffeaa7 100%)" if alert['priority'] == 'High' else "linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%)"
-                        else:
-                            border_color = "#e9ecef"
-                            bg_gradient = "linear-gradient(135deg, #f8f9fa 0%, #ffffff 100%)"
-                        
-                        try:
-                            from datetime import datetime as dt
-                            alert_time = dt.fromisoformat(alert['timestamp']).strftime('%B %d, %Y at %I:%M %p')
-                        except:
-                            alert_time = alert['timestamp']
-                        
-                        type_emoji = '💰' if alert['type'] == 'fee' else '📢'
-                        priority_emoji = '🚨' if alert['priority'] == 'High' else '⚠️' if alert['priority'] == 'Normal' else 'ℹ️'
-                        
-                        st.markdown(f"""
-                        <div style="
-                            background: {bg_gradient};
-                            border-left: 4px solid {border_color};
-                            padding: 1.5rem;
-                            border-radius: 12px;
-                            margin: 1rem 0;
-                            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-                            {'opacity: 0.7;' if alert['read'] else ''}
-                        ">
-                            <div style="display: flex; justify-content: space-between; align-items: flex-start; margin-bottom: 0.5rem;">
-                                <h4 style="margin: 0; color: #0F172A;">
-                                    {type_emoji} {priority_emoji} {alert['type'].title()} Notice
-                                    {'<span style="background: #28a745; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">READ</span>' if alert['read'] else '<span style="background: #dc3545; color: white; padding: 0.2rem 0.5rem; border-radius: 8px; font-size: 0.8rem; margin-left: 0.5rem;">NEW</span>'}
-                                </h4>
-                                <span style="font-size: 0.9rem; color: #6c757d;">{alert_time}</span>
-                            </div>
-                            <p style="margin: 0.5rem 0; color: #495057; line-height: 1.5;">{alert['message']}</p>
-                            <p style="margin: 0; font-size: 0.9rem; color: #6c757d;">From: {alert['sender']}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        if not alert['read']:
-                            col1, col2, col3 = st.columns([1, 1, 4])
-                            with col1:
-                                if st.button(f"✅ Mark as Read", key=f"other_read_{alert['id']}"):
-                                    mark_alert_as_read(current_student_id, alert['id'])
-                                    st.success("Alert marked as read!")
-                                    st.rerun()
-                else:
-                    st.info("📢 No general notices at this time.")
+                render_alert_tab("#### 📢 General Notices", alert_buckets['notice'], 'other_read', label='Notice',
+                                 empty_message="📢 No general notices at this time.")
         else:
-            st.markdown("""
-            <div style="
-                background: linear-gradient(135deg, #e8f5e8 0%, #c3e6cb 100%);
-                color: #155724;
-                padding: 2rem;
-                border-radius: 15px;
-                margin: 1rem 0;
-                text-align: center;
-                border-left: 5px solid #28a745;
-            ">
-                <h3 style="margin: 0 0 0.5rem 0; color: #155724;">📢 No New Alerts</h3>
-                <p style="margin: 0; opacity: 0.8;">You're all caught up! No new notifications from your teachers.</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(EMPTY_ALERTS_HTML, unsafe_allow_html=True)
     
     # Student Profile Section
     st.markdown("### 🎓 College Student Profile")
     
-    # Get current logged-in user data
-    current_user_data = None
-    current_username = None
-    if st.session_state.get('logged_in') and 'user_credentials' in st.session_state:
-        # Find the current user's data based on the selected role
-        for username, user_data in st.session_state.user_credentials.items():
-            if user_data.get('role') == 'student':
-                current_user_data = user_data
-                current_username = username
-                break
-    
     # Profile information in columns
     col1, col2 = st.columns([1, 2])
     
@@ -1674,20 +2167,12 @@ def show_student_dashboard():
             
             # Format dates if available
             if created_at != 'Not Available':
-                try:
-                    from datetime import datetime as dt
-                    created_date = dt.fromisoformat(created_at).strftime('%B %d, %Y')
-                except:
-                    created_date = created_at
+                created_date = format_timestamp(created_at, DATE_DISPLAY_FORMAT)
             else:
                 created_date = 'Not Available'
                 
             if last_login and last_login != 'Never' and last_login != 'Not Available':
-                try:
-                    from datetime import datetime as dt
-                    last_login_date = dt.fromisoformat(last_login).strftime('%B %d, %Y at %I:%M %p')
-                except:
-                    last_login_date = last_login
+                last_login_date = format_timestamp(last_login)
             else:
                 last_login_date = 'Never'
         else:
@@ -1699,51 +2184,9 @@ def show_student_dashboard():
             created_date = 'Not Available'
             last_login_date = 'Never'
         
-        st.markdown(f"""
-        <div style="
-            background: rgba(255, 255, 255, 0.95);
-            padding: 2rem;
-            border-radius: 15px;
-            border: 1px solid rgba(13, 148, 136, 0.2);
-            box-shadow: 0 4px 16px rgba(15, 23, 42, 0.1);
-        ">
-            <h4 style="color: #0F172A; margin-top: 0;">Personal Information</h4>
-            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 1rem; margin-bottom: 1rem;">
-                <div>
-                    <strong style="color: #0D9488;">Full Name:</strong><br>
-                    <span style="color: #475569;">{full_name}</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Student ID:</strong><br>
-                    <span style="color: #475569;">{student_id}</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Username:</strong><br>
-                    <span style="color: #475569;">{current_username if current_username else 'Not Available'}</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Academic Year:</strong><br>
-                    <span style="color: #475569;">2024-2025</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Email:</strong><br>
-                    <span style="color: #475569;">{email}</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Program:</strong><br>
-                    <span style="color: #475569;">Bachelor of Science</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Registration Date:</strong><br>
-                    <span style="color: #475569;">{created_date}</span>
-                </div>
-                <div>
-                    <strong style="color: #0D9488;">Last Login:</strong><br>
-                    <span style="color: #475569;">{last_login_date}</span>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(render_profile_card(
+            full_name, email, student_id, current_username or 'Not Available', created_date, last_login_date
+        ), unsafe_allow_html=True)
     
     # Academic Overview for College Student
     st.markdown("<br>", unsafe_allow_html=True)
@@ -1782,13 +2225,13 @@ def show_student_dashboard():
             # Personal student data selection
             st.markdown("#### 🎯 Select Your Student ID")
             student_id = st.selectbox("Choose your Student ID to view personal analytics:", 
-                                    [''] + list(data['Student_ID'].unique()), 
+                                    [''] + student_id_options(data), 
                                     key="student_id_selector")
             
             if student_id:
-                student_row = data[data['Student_ID'] == student_id]
-                if len(student_row) > 0:
-                    student = student_row.iloc[0]
+                student_pos = student_row_positions(data).get(student_id)
+                if student_pos is not None:
+                    student = data.iloc[student_pos]
                     
                     # Personal Performance Card
                     st.markdown(f"""
@@ -1812,35 +2255,7 @@ def show_student_dashboard():
                     
                     # Personalized recommendations
                     st.markdown("#### 💡 Personalized Recommendations")
-                    recommendations = []
-                    
-                    if student['Attendance'] < 80:
-                        recommendations.append({
-                            'title': '📈 Improve Attendance',
-                            'message': f"Your attendance is {student['Attendance']}%. Aim for 85%+",
-                            'type': 'warning' if student['Attendance'] < 70 else 'info'
-                        })
-                    
-                    if student['Test_Score'] < 70:
-                        recommendations.append({
-                            'title': '📚 Academic Support',
-                            'message': f"Test score: {student['Test_Score']}. Consider tutoring",
-                            'type': 'warning'
-                        })
-                    
-                    if student['Fee_Status'].lower() in ['pending', 'overdue']:
-                        recommendations.append({
-                            'title': '💰 Fee Payment',
-                            'message': "Please resolve your fee status",
-                            'type': 'danger' if student['Fee_Status'].lower() == 'overdue' else 'warning'
-                        })
-                    
-                    if not recommendations:
-                        recommendations.append({
-                            'title': '🎉 Great Job!',
-                            'message': "You're doing well! Keep it up!",
-                            'type': 'success'
-                        })
+                    recommendations = build_recommendations(data).iloc[student_pos]
                     
                     for rec in recommendations:
                         st.markdown(f"""
@@ -1854,29 +2269,17 @@ def show_student_dashboard():
             # Class-wide analytics for context
             st.markdown("#### 📈 Class Performance Overview")
             
+            stats = dashboard_aggregates(data)
             col1, col2, col3 = st.columns(3)
             with col1:
-                avg_attendance = data['Attendance'].mean()
-                st.metric("📅 Class Avg Attendance", f"{avg_attendance:.1f}%")
+                st.metric("📅 Class Avg Attendance", f"{stats['avg_attendance']:.1f}%")
             with col2:
-                avg_score = data['Test_Score'].mean()
-                st.metric("📝 Class Avg Score", f"{avg_score:.1f}")
+                st.metric("📝 Class Avg Score", f"{stats['avg_score']:.1f}")
             with col3:
-                high_risk_count = len(data[data['Final_Risk'].isin(['High Risk', 'Very High Risk'])])
-                st.metric("⚠️ High Risk Students", f"{high_risk_count}/{len(data)}")
+                st.metric("⚠️ High Risk Students", f"{stats['high_risk']}/{stats['total']}")
             
             # Risk distribution chart
-            import plotly.express as px
-            fig = px.pie(data['Final_Risk'].value_counts().reset_index(), 
-                        values='count', names='Final_Risk',
-                        title="Class Risk Distribution",
-                        color_discrete_map={
-                            'Very High Risk': '#ff6b6b',
-                            'High Risk': '#ff9f43', 
-                            'Medium Risk': '#ffa726',
-                            'Low Risk': '#66bb6a'
-                        })
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(risk_distribution_pie(data), use_container_width=True)
         
         with tab3:
             # Raw data display
@@ -1884,12 +2287,12 @@ def show_student_dashboard():
             st.info("This shows the complete academic dataset uploaded by your teachers/counselors.")
             
             # Data summary
-            st.markdown(f"**Dataset Information:**")
+            st.markdown("**Dataset Information:**")
             col_info1, col_info2, col_info3 = st.columns(3)
             with col_info1:
                 st.metric("📊 Total Records", len(data))
             with col_info2:
-                st.metric("📋 Data Columns", len(data.columns))
+                st.metric("📋 Data Columns", len(display_columns(data)))
             with col_info3:
                 st.metric("📅 Last Updated", datetime.now().strftime("%Y-%m-%d"))
             
@@ -1900,18 +2303,19 @@ def show_student_dashboard():
             with col1:
                 # Column selection with better defaults
                 default_columns = ['Student_ID', 'Attendance', 'Test_Score', 'Fee_Status', 'Final_Risk', 'Rule_Score']
-                available_defaults = [col for col in default_columns if col in data.columns]
+                column_options = display_columns(data)
+                available_defaults = [col for col in default_columns if col in column_options]
                 
                 show_columns = st.multiselect(
                     "📑 Select columns to display:",
-                    options=data.columns.tolist(),
-                    default=available_defaults if available_defaults else data.columns.tolist()[:6]
+                    options=column_options,
+                    default=available_defaults if available_defaults else column_options[:6]
                 )
                 
                 # Risk level filter
                 risk_filter = st.multiselect(
                     "⚠️ Filter by Risk Level:",
-                    options=['All'] + data['Final_Risk'].unique().tolist(),
+                    options=['All'] + risk_levels_present(data),
                     default=['All']
                 )
             
@@ -1922,23 +2326,25 @@ def show_student_dashboard():
                 search_student = st.text_input("🔍 Search Student ID:", placeholder="Enter Student ID")
             
             if show_columns:
-                # Apply filters
-                filtered_data = data.copy()
+                # Combine the filters into one row mask over the source frame (no copies)
+                mask = np.ones(len(data), dtype=bool)
                 
                 # Apply risk filter
                 if risk_filter and 'All' not in risk_filter:
-                    filtered_data = filtered_data[filtered_data['Final_Risk'].isin(risk_filter)]
+                    mask &= data['Final_Risk'].isin(risk_filter).to_numpy()
                 
                 # Apply student ID search
                 if search_student:
-                    filtered_data = filtered_data[filtered_data['Student_ID'].astype(str).str.contains(search_student, case=False, na=False)]
+                    mask &= data['Student_ID'].astype(str).str.contains(search_student, case=False, na=False, regex=False).to_numpy()
                 
-                # Select columns and limit rows
-                display_data = filtered_data[show_columns].head(max_rows)
+                # Only the rows actually shown are copied out
+                matching_rows = np.flatnonzero(mask)
+                filtered_count = len(matching_rows)
+                display_data = data.iloc[matching_rows[:max_rows]][show_columns]
                 
                 # Show filtering results
-                if len(filtered_data) < len(data):
-                    st.info(f"📊 Showing {len(display_data)} of {len(filtered_data)} filtered records (from {len(data)} total)")
+                if filtered_count < len(data):
+                    st.info(f"📊 Showing {len(display_data)} of {filtered_count} filtered records (from {len(data)} total)")
                 else:
                     st.info(f"📊 Showing {len(display_data)} of {len(data)} total records")
                 
@@ -1947,19 +2353,8 @@ def show_student_dashboard():
                 
                 # Color-code risk levels in the dataframe if Final_Risk column is selected
                 if 'Final_Risk' in show_columns:
-                    def highlight_risk(val):
-                        if val == 'Very High Risk':
-                            return 'background-color: #ffebee; color: #c62828;'
-                        elif val == 'High Risk':
-                            return 'background-color: #fff3e0; color: #ef6c00;'
-                        elif val == 'Medium Risk':
-                            return 'background-color: #fff8e1; color: #f57f17;'
-                        elif val == 'Low Risk':
-                            return 'background-color: #e8f5e8; color: #2e7d32;'
-                        return ''
-                    
                     if 'Final_Risk' in display_data.columns:
-                        styled_data = display_data.style.applymap(highlight_risk, subset=['Final_Risk'])
+                        styled_data = display_data.style.apply(risk_cell_styles, subset=['Final_Risk'])
                         st.dataframe(styled_data, use_container_width=True)
                     else:
                         st.dataframe(display_data, use_container_width=True)
@@ -1972,7 +2367,7 @@ def show_student_dashboard():
                 
                 with col_dl1:
                     # Download filtered data as CSV
-                    csv = display_data.to_csv(index=False)
+                    csv = to_csv_bytes(display_data)
                     st.download_button(
                         label="📥 Download Filtered Data (CSV)",
                         data=csv,
@@ -1981,43 +2376,28 @@ def show_student_dashboard():
                     )
                 
                 with col_dl2:
-                    # Download complete dataset
-                    if st.button("📊 Download Complete Dataset"):
-                        complete_csv = data.to_csv(index=False)
-                        st.download_button(
-                            label="📥 Download Complete Data (CSV)",
-                            data=complete_csv,
-                            file_name=f'complete_student_data_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
-                            mime='text/csv',
-                            key="complete_download"
-                        )
+                    # Download complete dataset (cached bytes, so one click downloads)
+                    st.download_button(
+                        label="📥 Download Complete Data (CSV)",
+                        data=to_csv_bytes(data),
+                        file_name=f'complete_student_data_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
+                        mime='text/csv',
+                        key="complete_download"
+                    )
                 
                 with col_dl3:
                     # Download summary report
-                    if st.button("📈 Generate Summary Report"):
-                        summary_stats = data.describe()
-                        summary_csv = summary_stats.to_csv()
-                        st.download_button(
-                            label="📊 Download Summary Stats",
-                            data=summary_csv,
-                            file_name=f'data_summary_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
-                            mime='text/csv',
-                            key="summary_download"
-                        )
+                    st.download_button(
+                        label="📊 Download Summary Stats",
+                        data=summary_csv_bytes(data),
+                        file_name=f'data_summary_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
+                        mime='text/csv',
+                        key="summary_download"
+                    )
             else:
                 st.warning("⚠️ Please select at least one column to display the data.")
     else:
-        st.markdown("""
-        <div class="alert-warning">
-            <h3>📁 No Data Available</h3>
-            <p>No academic data has been uploaded yet. Please ask your teachers or counselors to upload the institutional data files to view your dashboard analytics.</p>
-            <ul>
-                <li>Teachers can upload class performance data</li>
-                <li>Counselors can upload institution-wide analytics</li>
-                <li>Once uploaded, your personal analytics will appear here</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(NO_STUDENT_DATA_HTML, unsafe_allow_html=True)
 
 # --- TEACHER DASHBOARD ---
 def show_teacher_dashboard():
@@ -2032,13 +2412,18 @@ def show_teacher_dashboard():
         st.session_state.selected_role = None
         st.rerun()
     
+    # Sender name for every alert sent from this page, read once from the login identity
+    _, teacher_data = get_current_user('teacher')
+    current_teacher = teacher_data.get('full_name', 'Teacher') if teacher_data else "Teacher"
+    
     data = show_upload()
     
     if data is not None and len(data) > 0:
-        total = len(data)
-        high_risk = len(data[data['Final_Risk'].isin(['Very High Risk', 'High Risk'])])
-        avg_attendance = data['Attendance'].mean()
-        avg_score = data['Test_Score'].mean()
+        stats = dashboard_aggregates(data)
+        total = stats['total']
+        high_risk = stats['high_risk']
+        avg_attendance = stats['avg_attendance']
+        avg_score = stats['avg_score']
         
         st.markdown("### 📊 Class Overview")
         col1, col2, col3, col4 = st.columns(4)
@@ -2054,102 +2439,71 @@ def show_teacher_dashboard():
         
         # At-risk students list
         st.markdown("### ⚠️ Students Requiring Attention")
-        at_risk = data[data['Final_Risk'].isin(['Very High Risk', 'High Risk'])].sort_values('Rule_Score', ascending=False)
+        at_risk = stats['at_risk']
         
         if len(at_risk) > 0:
             # Alert Management Section
             st.markdown("#### 📤 Send Alerts to Students")
             
-            # Quick alert for at-risk students
-            for _, student in at_risk.iterrows():
-                risk_class = student['Final_Risk'].lower().replace(' ', '-')
-                
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    st.markdown(f"""
-                    <div class="dashboard-card">
-                        <h4>Student ID: {student['Student_ID']} <span class="risk-{risk_class}">{student['Final_Risk']}</span></h4>
-                        <p>Attendance: {student['Attendance']}% | Test Score: {student['Test_Score']} | Fee: {student['Fee_Status']} | Risk Score: {student['Rule_Score']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    if st.button(f"📨 Send Alert", key=f"alert_{student['Student_ID']}"):
-                        st.session_state[f"show_alert_form_{student['Student_ID']}"] = True
-                
-                # Show alert form if button clicked
-                if st.session_state.get(f"show_alert_form_{student['Student_ID']}", False):
-                    with st.expander(f"📝 Send Alert to Student {student['Student_ID']}", expanded=True):
-                        with st.form(f"alert_form_{student['Student_ID']}"):
-                            alert_type = st.selectbox(
-                                "Alert Type:",
-                                ['performance', 'attendance', 'fee', 'general'],
-                                key=f"type_{student['Student_ID']}"
-                            )
-                            
-                            priority = st.selectbox(
-                                "Priority:",
-                                ['High', 'Normal', 'Low'],
-                                key=f"priority_{student['Student_ID']}"
-                            )
-                            
-                            # Pre-filled message based on student issues
-                            suggested_message = ""
-                            if student['Attendance'] < 70:
-                                suggested_message += f"Your attendance is {student['Attendance']}%, which is below the required minimum. Please improve your class attendance. "
-                            if student['Test_Score'] < 50:
-                                suggested_message += f"Your recent test score of {student['Test_Score']} indicates academic difficulties. Please consider additional study support. "
-                            if student['Fee_Status'].lower() in ['pending', 'overdue']:
-                                suggested_message += f"Your fee status is {student['Fee_Status']}. Please resolve this at the earliest. "
-                            
-                            if not suggested_message:
-                                suggested_message = "We've noticed some areas where you could improve. Please see me for a discussion."
-                            
-                            alert_message = st.text_area(
-                                "Message:",
-                                value=suggested_message,
-                                height=100,
-                                key=f"message_{student['Student_ID']}"
-                            )
-                            
-                            col_send1, col_send2 = st.columns([1, 1])
-                            with col_send1:
-                                send_alert = st.form_submit_button("📤 Send Alert")
-                            with col_send2:
-                                cancel_alert = st.form_submit_button("❌ Cancel")
-                            
-                            if send_alert and alert_message:
-                                # Get current teacher info
-                                current_teacher = "Teacher"
-                                if st.session_state.get('logged_in') and 'user_credentials' in st.session_state:
-                                    for username, user_data in st.session_state.user_credentials.items():
-                                        if user_data.get('role') == 'teacher':
-                                            current_teacher = user_data.get('full_name', 'Teacher')
-                                            break
-                                
-                                alert_id = send_alert_to_student(
-                                    student['Student_ID'],
-                                    alert_message,
-                                    alert_type,
-                                    current_teacher,
-                                    priority
-                                )
-                                
-                                st.success(f"✅ Alert sent successfully to Student {student['Student_ID']}!")
-                                st.session_state[f"show_alert_form_{student['Student_ID']}"] = False
-                                st.rerun()
-                            
-                            if cancel_alert:
-                                st.session_state[f"show_alert_form_{student['Student_ID']}"] = False
-                                st.rerun()
+            # At-risk student summaries
+            # Plain namedtuples per row instead of boxing each one into a Series
+            at_risk_cols = ['Student_ID', 'Final_Risk', 'Attendance', 'Test_Score', 'Fee_Status', 'Rule_Score']
+            for student in at_risk[at_risk_cols].itertuples(index=False):
+                risk_class = student.Final_Risk.lower().replace(' ', '-')
+                st.markdown(f"""
+                <div class="dashboard-card">
+                    <h4>Student ID: {student.Student_ID} <span class="risk-{risk_class}">{student.Final_Risk}</span></h4>
+                    <p>Attendance: {student.Attendance}% | Test Score: {student.Test_Score} | Fee: {student.Fee_Status} | Risk Score: {student.Rule_Score}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            # Quick alerts: one editable table instead of a form per student
+            st.markdown("#### 📝 Compose Individual Alerts")
+            st.caption("Tick the students to alert, adjust the type, priority or pre-filled message, then send them together.")
+            editor_df = pd.DataFrame({
+                'Send': False,
+                'Student_ID': at_risk['Student_ID'].to_numpy(),
+                'Final_Risk': at_risk['Final_Risk'].astype(str).to_numpy(),
+                'Type': ALERT_TYPES[0],
+                'Priority': 'High',
+                'Message': suggested_alert_messages(data).loc[at_risk.index].to_numpy(),
+            })
+            edited = st.data_editor(
+                editor_df,
+                # Versioned key: bumping it after a send clears the ticks
+                key=f"alerts_editor_{st.session_state.alerts_editor_version}",
+                hide_index=True,
+                use_container_width=True,
+                disabled=['Student_ID', 'Final_Risk'],
+                column_config={
+                    'Send': st.column_config.CheckboxColumn("Send"),
+                    'Student_ID': st.column_config.Column("Student ID"),
+                    'Final_Risk': st.column_config.Column("Risk"),
+                    'Type': st.column_config.SelectboxColumn("Alert Type", options=ALERT_TYPES, required=True),
+                    'Priority': st.column_config.SelectboxColumn("Priority", options=list(ALERT_PRIORITIES), required=True),
+                    'Message': st.column_config.TextColumn("Message", width='large', required=True),
+                },
+            )
+            
+            if st.button("📤 Send Selected Alerts", key="send_selected_alerts"):
+                selected = edited[edited['Send'] & (edited['Message'].fillna('').str.strip() != '')]
+                if len(selected) > 0:
+                    alert_ids = send_alerts(
+                        zip(selected['Student_ID'], selected['Message'], selected['Type'], selected['Priority']),
+                        current_teacher
+                    )
+                    st.toast(f"✅ Sent {len(alert_ids)} alert{'s' if len(alert_ids) != 1 else ''}")
+                    st.session_state.alerts_editor_version += 1
+                    st.rerun()
+                else:
+                    st.warning("⚠️ Tick at least one student with a message to send.")
             
             # Bulk alert section
             st.markdown("#### 📢 Send Bulk Alert to All At-Risk Students")
             with st.expander("📝 Compose Bulk Alert"):
                 with st.form("bulk_alert_form"):
-                    bulk_alert_type = st.selectbox("Alert Type:", ['performance', 'attendance', 'fee', 'general'])
-                    bulk_priority = st.selectbox("Priority:", ['High', 'Normal', 'Low'])
+                    bulk_alert_type = st.selectbox("Alert Type:", ALERT_TYPES)
+                    bulk_priority = st.selectbox("Priority:", ALERT_PRIORITIES)
                     bulk_message = st.text_area(
                         "Message for all at-risk students:",
                         "Your recent academic performance indicates you may need additional support. Please schedule a meeting with me to discuss improvement strategies.",
@@ -2159,24 +2513,15 @@ def show_teacher_dashboard():
                     send_bulk = st.form_submit_button("📤 Send to All At-Risk Students")
                     
                     if send_bulk and bulk_message:
-                        # Get current teacher info
-                        current_teacher = "Teacher"
-                        if st.session_state.get('logged_in') and 'user_credentials' in st.session_state:
-                            for username, user_data in st.session_state.user_credentials.items():
-                                if user_data.get('role') == 'teacher':
-                                    current_teacher = user_data.get('full_name', 'Teacher')
-                                    break
-                        
-                        sent_count = 0
-                        for _, student in at_risk.iterrows():
-                            send_alert_to_student(
-                                student['Student_ID'],
-                                bulk_message,
-                                bulk_alert_type,
-                                current_teacher,
-                                bulk_priority
-                            )
-                            sent_count += 1
+                        # One transaction for the whole class instead of one write per student
+                        alert_ids = send_alerts_bulk(
+                            at_risk['Student_ID'].tolist(),
+                            bulk_message,
+                            bulk_alert_type,
+                            current_teacher,
+                            bulk_priority
+                        )
+                        sent_count = len(alert_ids)
                         
                         st.success(f"✅ Bulk alert sent to {sent_count} at-risk students!")
                         st.rerun()
@@ -2188,28 +2533,10 @@ def show_teacher_dashboard():
         col1, col2 = st.columns(2)
         
         with col1:
-            fig_risk = px.pie(data['Final_Risk'].value_counts().reset_index(), 
-                             values='count', names='Final_Risk',
-                             title="Risk Distribution",
-                             color_discrete_map={
-                                 'Very High Risk': '#ff6b6b',
-                                 'High Risk': '#ff9f43', 
-                                 'Medium Risk': '#ffa726',
-                                 'Low Risk': '#66bb6a'
-                             })
-            st.plotly_chart(fig_risk, use_container_width=True)
+            st.plotly_chart(risk_distribution_pie(data, "Risk Distribution"), use_container_width=True)
         
         with col2:
-            fig_scatter = px.scatter(data, x='Attendance', y='Test_Score', 
-                                   color='Final_Risk', size='Rule_Score',
-                                   title="Attendance vs Test Score",
-                                   color_discrete_map={
-                                       'Very High Risk': '#ff6b6b',
-                                       'High Risk': '#ff9f43',
-                                       'Medium Risk': '#ffa726', 
-                                       'Low Risk': '#66bb6a'
-                                   })
-            st.plotly_chart(fig_scatter, use_container_width=True)
+            st.plotly_chart(attendance_score_scatter(data), use_container_width=True)
     else:
         st.markdown("""
         <div class="alert-warning">
@@ -2237,24 +2564,21 @@ def show_counselor_dashboard():
     data = show_upload()
     
     if data is not None and len(data) > 0:
+        stats = dashboard_aggregates(data)
         st.markdown("### 📊 Institution-Wide Analytics")
         
         # Advanced metrics
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("👥 Total Students", len(data))
+            st.metric("👥 Total Students", stats['total'])
         with col2:
-            very_high = len(data[data['Final_Risk'] == 'Very High Risk'])
-            st.metric("🚨 Critical Cases", very_high)
+            st.metric("🚨 Critical Cases", stats['very_high'])
         with col3:
-            high = len(data[data['Final_Risk'] == 'High Risk'])
-            st.metric("⚠️ High Risk", high)
+            st.metric("⚠️ High Risk", stats['high'])
         with col4:
-            overdue_fees = len(data[data['Fee_Status'].str.lower() == 'overdue'])
-            st.metric("💰 Fee Issues", overdue_fees)
+            st.metric("💰 Fee Issues", stats['overdue_fees'])
         with col5:
-            low_attendance = len(data[data['Attendance'] < 70])
-            st.metric("📉 Poor Attendance", low_attendance)
+            st.metric("📉 Poor Attendance", stats['low_attendance'])
         
         # Detailed analytics
         st.markdown("### 📈 Comprehensive Analysis")
@@ -2265,45 +2589,33 @@ def show_counselor_dashboard():
             col1, col2 = st.columns(2)
             with col1:
                 # Risk by fee status
-                risk_fee = pd.crosstab(data['Fee_Status'], data['Final_Risk'])
-                fig_bar = px.bar(risk_fee.reset_index().melt(id_vars='Fee_Status'),
-                               x='Fee_Status', y='value', color='Final_Risk',
-                               title="Risk Distribution by Fee Status")
-                st.plotly_chart(fig_bar, use_container_width=True)
+                st.plotly_chart(risk_by_fee_bar(stats['risk_fee']), use_container_width=True)
             
             with col2:
                 # Attendance vs Risk
-                fig_box = px.box(data, x='Final_Risk', y='Attendance',
-                               title="Attendance Distribution by Risk Level")
-                st.plotly_chart(fig_box, use_container_width=True)
+                st.plotly_chart(attendance_by_risk_box(data), use_container_width=True)
         
         with tab2:
             # Performance metrics
-            fig_hist1 = px.histogram(data, x='Attendance', color='Final_Risk',
-                                   title="Attendance Distribution", nbins=20)
-            st.plotly_chart(fig_hist1, use_container_width=True)
+            st.plotly_chart(risk_histogram(data, 'Attendance', "Attendance Distribution"), use_container_width=True)
             
-            fig_hist2 = px.histogram(data, x='Test_Score', color='Final_Risk',
-                                   title="Test Score Distribution", nbins=20)
-            st.plotly_chart(fig_hist2, use_container_width=True)
+            st.plotly_chart(risk_histogram(data, 'Test_Score', "Test Score Distribution"), use_container_width=True)
         
         with tab3:
             st.markdown("#### 🎯 Intervention Recommendations")
             
             # Priority students
-            priority = data[data['Final_Risk'] == 'Very High Risk'].sort_values('Rule_Score', ascending=False)
+            priority = stats['priority']
             
             if len(priority) > 0:
                 st.markdown("**Immediate Intervention Required:**")
-                for _, student in priority.head(10).iterrows():
+                top_priority = priority.head(10)
+                issues = intervention_issues(data).loc[top_priority.index]
+                for student_id, student_issues in zip(top_priority['Student_ID'], issues):
                     st.markdown(f"""
                     <div class="dashboard-card">
-                        <h4>🚨 Student ID: {student['Student_ID']}</h4>
-                        <p><strong>Issues:</strong> 
-                        {'Low Attendance (' + str(student['Attendance']) + '%) ' if student['Attendance'] < 70 else ''}
-                        {'Poor Performance (' + str(student['Test_Score']) + ') ' if student['Test_Score'] < 50 else ''}
-                        {'Fee Issues (' + student['Fee_Status'] + ')' if student['Fee_Status'].lower() != 'paid' else ''}
-                        </p>
+                        <h4>🚨 Student ID: {student_id}</h4>
+                        <p><strong>Issues:</strong> {student_issues}</p>
                         <p><strong>Recommended Actions:</strong> Personal counseling, academic support, financial aid review</p>
                     </div>
                     """, unsafe_allow_html=True)
@@ -2312,14 +2624,12 @@ def show_counselor_dashboard():
         
         # Download complete report
         st.markdown("### 📋 Data Export")
-        if st.button("📥 Download Complete Analysis Report"):
-            csv = data.to_csv(index=False)
-            st.download_button(
-                label="💾 Download CSV Report",
-                data=csv,
-                file_name=f'dropsafe_analysis_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
-                mime='text/csv'
-            )
+        st.download_button(
+            label="💾 Download CSV Report",
+            data=to_csv_bytes(data),
+            file_name=f'dropsafe_analysis_{datetime.now().strftime("%Y%m%d_%H%M")}.csv',
+            mime='text/csv'
+        )
     else:
         st.markdown("""
         <div class="alert-warning">
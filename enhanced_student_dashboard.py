@@ -5,7 +5,7 @@ from datetime import datetime
 from risk_model import AdvancedRiskPredictor
 import plotly.graph_objects as go
 from shared_data import shared_data_manager
-from ai_counselor import ai_counselor
+from ai_counselor import get_counselor
 
 # Page config
 st.set_page_config(
@@ -552,7 +552,7 @@ def main():
     
     with tab1:
         # Render AI chat interface
-        ai_counselor.render_chat_interface(
+        get_counselor().render_chat_interface(
             student_id=str(student['student_id']), 
             student_name=student['name']
         )
@@ -4,10 +4,12 @@ Handles risk alerts and student data sharing between dashboards
 """
 
 import pandas as pd
+import numpy as np
 import json
 import os
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 class SharedDataManager:
     def __init__(self):
@@ -16,6 +18,8 @@ class SharedDataManager:
         self.student_lists_file = os.path.join(self.data_dir, "student_lists.json")
         self.chat_history_file = os.path.join(self.data_dir, "chat_history.json")
         self.feedback_file = os.path.join(self.data_dir, "counselor_feedback.json")
+        self.response_cache_file = os.path.join(self.data_dir, "response_cache.json")
+        self.semantic_cache_file = os.path.join(self.data_dir, "semantic_cache.npz")
         
         # Create data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
@@ -41,6 +45,9 @@ class SharedDataManager:
             
         if not os.path.exists(self.feedback_file):
             self._save_json(self.feedback_file, {})
+        
+        if not os.path.exists(self.response_cache_file):
+            self._save_json(self.response_cache_file, {})
     
     def _load_json(self, filepath: str) -> dict:
         """Load JSON data from file"""
@@ -50,10 +57,23 @@ class SharedDataManager:
         except (FileNotFoundError, json.JSONDecodeError):
             return {}
     
+    def _atomic_write(self, filepath: str, write):
+        """Write a file through a sibling temp file and swap it in, so readers never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filepath)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
     def _save_json(self, filepath: str, data: dict):
         """Save JSON data to file"""
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+        self._atomic_write(filepath, lambda f: f.write(payload))
     
     def update_risk_alerts(self, student_data: pd.DataFrame):
         """Update risk alerts based on student data from teacher dashboard"""
@@ -155,5 +175,52 @@ class SharedDataManager:
         feedback_data = self._load_json(self.feedback_file)
         return feedback_data.get(str(student_id))
 
+    def load_response_cache(self) -> Dict[str, str]:
+        """Get all cached AI counselor responses by prompt hash, oldest first"""
+        cache_data = self._load_json(self.response_cache_file)
+        return {prompt_key: entry["response"] for prompt_key, entry in cache_data.items()}
+    
+    def save_cached_response(self, prompt_key: str, response: str):
+        """Save an AI counselor response keyed by prompt hash"""
+        cache_data = self._load_json(self.response_cache_file)
+        
+        cache_data[prompt_key] = {
+            "response": response,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # Keep only the most recent 500 cached responses
+        if len(cache_data) > 500:
+            cache_data = dict(list(cache_data.items())[-500:])
+        
+        self._save_json(self.response_cache_file, cache_data)
+
+    def load_semantic_cache(self) -> Tuple[Optional[np.ndarray], List[str], List[str]]:
+        """Load semantic cache embeddings with their paired responses and student keys"""
+        try:
+            with np.load(self.semantic_cache_file) as cache:
+                embs = cache["embs"].astype(np.float32)
+                entries = json.loads(str(cache["entries"]))
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None, [], []
+        
+        if len(embs) != len(entries):
+            return None, [], []
+        
+        return embs, [e["response"] for e in entries], [e["student_key"] for e in entries]
+    
+    def save_semantic_cache(self, embs: np.ndarray, responses: List[str], student_keys: List[str]):
+        """Save semantic cache embeddings and paired responses"""
+        # Keep only the most recent 500 cached prompts
+        embs, responses, student_keys = embs[-500:], responses[-500:], student_keys[-500:]
+        
+        entries = json.dumps([
+            {"response": response, "student_key": key}
+            for response, key in zip(responses, student_keys)
+        ], ensure_ascii=False)
+        # Embeddings and replies share one archive, swapped in together, so they cannot drift apart
+        self._atomic_write(self.semantic_cache_file,
+                           lambda f: np.savez(f, embs=embs, entries=np.array(entries)))
+
 # Global instance
 shared_data_manager = SharedDataManager()
\ No newline at end of file
@@ -67,6 +67,21 @@ print(f"Model trained successfully! Accuracy: {accuracy:.2%}")
 joblib.dump(model, 'dropout_model.joblib')
 print("Model saved as 'dropout_model.joblib'")
 
+# 7b. (Optional) Export an ONNX copy for faster inference with onnxruntime
+try:
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    onnx_model = convert_sklearn(
+        model,
+        initial_types=[('X', FloatTensorType([None, len(feature_columns)]))],
+        options={id(model): {'zipmap': False}},
+    )
+    with open('dropout_model.onnx', 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    print("ONNX model saved as 'dropout_model.onnx'")
+except ImportError:
+    print("skl2onnx not installed; skipping ONNX export")
+
 # 8. (Optional) Save the synthetic data to Excel files to use for testing the dashboard
 df[['Student_ID', 'Attendance']].to_excel('sample_attendance.xlsx', index=False)
 df[['Student_ID', 'Test_Score']].to_excel('sample_scores.xlsx', index=False)